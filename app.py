@@ -6,16 +6,26 @@ Control Box vs Experimental Box
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import io
+import json
 from pathlib import Path
 import logging
 import plotly.graph_objects as go
+import plotly.io as pio
 
 from src.load import load_all_periods
-from src.transform import transform_all_data, apply_smoothing, detect_wall_type_changes
+from src.transform import (
+    transform_all_data, apply_smoothing, detect_wall_type_changes, split_by_period, aggregate_box_outside,
+    categorize_periods
+)
 from src.plots import (
     plot_timeline_box, plot_timeline_wall, plot_timeline_wall_comparison, plot_sandwich_view,
     plot_thermal_gradient_summary, plot_thermal_gradient_normalized, plot_temperature_relationship,
-    plot_diagnostic_overlay, plot_correlation_heatmap, create_summary_table, BOX_COLORS, ROOM_TEMP_COLOR
+    plot_diagnostic_overlay, plot_correlation_heatmap, create_summary_table, downsample_lttb,
+    add_wall_type_markers,
+    BOX_COLORS, ROOM_TEMP_COLOR
 )
 
 # Configure logging
@@ -36,9 +46,13 @@ st.markdown("**Control Box vs Experimental Box - Thermal Performance Analysis**"
 
 # ===== DATA LOADING =====
 
-@st.cache_data
+@st.cache_resource
 def load_data():
-    """Load and transform all period data."""
+    """
+    Load and transform all period data.
+    Cached as a shared resource: the frames are read-only reference data,
+    so reruns get the same objects without pickling them.
+    """
     base_folder = Path(__file__).parent / 'data_cleaned'
     
     with st.spinner("Loading CSV files..."):
@@ -51,7 +65,28 @@ def load_data():
     with st.spinner("Transforming data..."):
         transformed = transform_all_data(periods)
     
-    return transformed
+    return index_levels(transformed)
+
+
+def index_levels(levels):
+    """
+    Add precomputed lookups next to the sensor/wall/box DataFrames:
+    - 'box_outside': outside surface averaged across walls per box
+    - '<level>_by_period': period-indexed dicts for every level
+    - 'sensors_by_period_box': sorted sensor ids present per (period, box_id)
+    """
+    levels['box_outside'] = aggregate_box_outside(levels.get('wall'))
+    for level in ['sensor', 'wall', 'box', 'box_outside']:
+        levels[f'{level}_by_period'] = split_by_period(levels.get(level))
+    
+    sensor_df = levels.get('sensor')
+    levels['sensors_by_period_box'] = {} if sensor_df is None else (
+        sensor_df.groupby(['period', 'box_id'], observed=True)['sensor_id']
+        .unique()
+        .apply(lambda ids: sorted(ids.tolist()))
+        .to_dict()
+    )
+    return levels
 
 
 # Load data
@@ -72,7 +107,7 @@ box_data = data.get('box')
 st.sidebar.header("⚙️ Controls")
 
 # Period selection
-available_periods = sorted(sensor_data['period'].unique()) if sensor_data is not None else []
+available_periods = list(sensor_data['period'].cat.categories) if sensor_data is not None else []
 period_option = st.sidebar.selectbox(
     "Period",
     options=available_periods,  # Remove 'Both' option for now
@@ -107,6 +142,7 @@ for s in excluded_sensors:
         box_id = 2
     sensor_id = int(s.split('Sensor ')[1])
     excluded_pairs.append((box_id, sensor_id))
+excluded_pairs = tuple(sorted(excluded_pairs))  # Hashable key for the cached helpers below
 
 st.sidebar.markdown("---")
 
@@ -206,21 +242,13 @@ else:  # Box Average or Per-Box Detail or Wall Comparison
 
 # ===== FILTER DATA BY PERIOD AND EXCLUDED SENSORS =====
 
-def filter_by_period(df, period_opt):
-    """Filter dataframe by period selection."""
-    if df is None or period_opt is None:
-        return df
-    # Filter to specific period
-    return df[df['period'] == period_opt].copy()
-
-
 def exclude_sensors(sensor_df, wall_df, box_df, excluded_pairs):
     """Remove excluded sensors and re-aggregate wall/box levels."""
     if not excluded_pairs or sensor_df is None:
         return sensor_df, wall_df, box_df
     
-    # Filter sensor data
-    filtered_sensor = sensor_df.copy()
+    # Filter sensor data (boolean masks already return new frames)
+    filtered_sensor = sensor_df
     for box_id, sensor_id in excluded_pairs:
         filtered_sensor = filtered_sensor[
             ~((filtered_sensor['box_id'] == box_id) & (filtered_sensor['sensor_id'] == sensor_id))
@@ -235,31 +263,104 @@ def exclude_sensors(sensor_df, wall_df, box_df, excluded_pairs):
     return filtered_sensor, filtered_wall, filtered_box
 
 
-# Apply sensor exclusion FIRST (before period filtering)
-filtered_sensor_all_periods, filtered_wall_all_periods, filtered_box_all_periods = exclude_sensors(
-    sensor_data, wall_data, box_data, excluded_pairs
-)
+@st.cache_resource(show_spinner=False)
+def get_excluded_data(excluded_pairs):
+    """
+    Sensor/wall/box levels for all periods with excluded sensors removed,
+    plus their period-indexed dicts (same layout as load_data(), also read-only).
+    Cached per exclusion set (a tuple of (box_id, sensor_id) pairs).
+    """
+    data = load_data()
+    if not excluded_pairs:
+        return data
+    
+    sensor_df, wall_df, box_df = exclude_sensors(data.get('sensor'), data.get('wall'), data.get('box'), excluded_pairs)
+    return index_levels(categorize_periods({'sensor': sensor_df, 'wall': wall_df, 'box': box_df}))
 
-# Then apply period filter
-filtered_sensor = filter_by_period(filtered_sensor_all_periods, period_option)
-filtered_wall = filter_by_period(filtered_wall_all_periods, period_option)
-filtered_box = filter_by_period(filtered_box_all_periods, period_option)
-
-# Apply smoothing
-if smoothing_option:
-    if filtered_box is not None:
-        filtered_box = apply_smoothing(
-            filtered_box, 
-            ['internal_temp', 'surface_temp', 'normalized_internal', 'normalized_surface'],
-            smoothing_option
-        )
+
+@st.cache_resource(show_spinner=False)
+def get_period_data(period_opt, excluded_pairs):
+    """
+    Period-filtered sensor/wall/box levels (read-only, shared like
+    get_excluded_data(): the entries of its period dicts, not copies).
+    Keyed only on the period and exclusion selections, so reruns
+    from any other widget skip the filtering.
+    """
+    levels = get_excluded_data(excluded_pairs)
     
-    if filtered_wall is not None:
-        filtered_wall = apply_smoothing(
-            filtered_wall,
-            ['out_internal', 'in_internal', 'out_surface', 'in_surface', 'surface_gradient', 'internal_gradient'],
-            smoothing_option
-        )
+    # Period filter is a dict lookup into the precomputed period index
+    sensor_df = levels['sensor_by_period'].get(period_opt)
+    wall_df = levels['wall_by_period'].get(period_opt)
+    box_df = levels['box_by_period'].get(period_opt)
+    
+    return sensor_df, wall_df, box_df
+
+
+@st.cache_resource(show_spinner=False)
+def get_smoothed_data(period_opt, excluded_pairs, smoothing_opt):
+    """
+    Smoothed wall/box levels for the timeline plots and the export, with the
+    smoothed values in '<col>_smooth' columns next to the raw ones.
+    Without smoothing this is just the period data. Shared and read-only,
+    like get_period_data().
+    """
+    _, wall_df, box_df = get_period_data(period_opt, excluded_pairs)
+    
+    # Apply smoothing
+    if smoothing_opt:
+        if box_df is not None:
+            box_df = apply_smoothing(
+                box_df, 
+                ['internal_temp', 'surface_temp', 'normalized_internal', 'normalized_surface'],
+                smoothing_opt
+            )
+        
+        if wall_df is not None:
+            wall_df = apply_smoothing(
+                wall_df,
+                ['out_internal', 'in_internal', 'out_surface', 'in_surface', 'surface_gradient', 'internal_gradient'],
+                smoothing_opt
+            )
+    
+    return wall_df, box_df
+
+
+@st.cache_data(show_spinner=False)
+def get_wall_type_changes(period_opt, excluded_pairs, box_id=2, wall_id=None):
+    """
+    Wall type change events for one box (optionally one wall) in the selected
+    period (cached). Detected on the unsmoothed wall level.
+    """
+    wall_df = get_excluded_data(excluded_pairs)['wall_by_period'].get(period_opt)
+    if wall_df is None:
+        return []
+    mask = wall_df['box_id'] == box_id
+    if wall_id is not None:
+        mask &= wall_df['wall_id'] == wall_id
+    return detect_wall_type_changes(wall_df[mask])
+
+
+@st.cache_data(show_spinner=False)
+def get_gradient_summary_json(gradient_periods, excluded_pairs):
+    """
+    Thermal gradient summary figure as Plotly JSON. It only depends on the
+    periods and exclusions, so other widget changes reuse the cached JSON.
+    """
+    wall_df = get_excluded_data(excluded_pairs).get('wall')
+    fig = plot_thermal_gradient_summary(wall_df, periods=list(gradient_periods))
+    return pio.to_json(fig)
+
+
+# Apply sensor exclusion FIRST (before period filtering)
+excluded_data = get_excluded_data(excluded_pairs)
+filtered_sensor_all_periods = excluded_data.get('sensor')
+filtered_wall_all_periods = excluded_data.get('wall')
+filtered_box_all_periods = excluded_data.get('box')
+filtered_box_outside = excluded_data['box_outside_by_period'].get(period_option)
+
+# Then apply period filter and smoothing
+filtered_sensor, filtered_wall, filtered_box = get_period_data(period_option, excluded_pairs)
+timeline_wall, timeline_box = get_smoothed_data(period_option, excluded_pairs, smoothing_option)
 
 
 # ===== CSV EXPORT (in sidebar) =====
@@ -277,37 +378,64 @@ with st.sidebar:
         if export_level == 'Sensor':
             export_df = filtered_sensor
         elif export_level == 'Wall':
-            export_df = filtered_wall
+            export_df = timeline_wall
         else:
-            export_df = filtered_box
+            export_df = timeline_box
         
         if export_df is not None and len(export_df) > 0:
-            csv = export_df.to_csv(index=False)
+            # Arrow's CSV writer is much faster than DataFrame.to_csv; writing
+            # straight into a bytes buffer avoids holding an extra str copy
+            table = pa.Table.from_pandas(export_df, preserve_index=False)
+            csv_buf = io.BytesIO()
+            pa_csv.write_csv(table, csv_buf)
+            csv_buf.seek(0)
             st.download_button(
                 label=f"Download {export_level} Data CSV",
-                data=csv,
+                data=csv_buf,
                 file_name=f"thermal_data_{export_level.lower()}_{period_option}.csv",
                 mime="text/csv",
             )
+            
+            parquet_buf = io.BytesIO()
+            export_df.to_parquet(parquet_buf, engine='pyarrow', compression='zstd', index=False)
+            parquet_buf.seek(0)
+            st.download_button(
+                label=f"Download {export_level} Data Parquet",
+                data=parquet_buf,
+                file_name=f"thermal_data_{export_level.lower()}_{period_option}.parquet",
+                mime="application/octet-stream",
+            )
         else:
             st.error("No data available for export")
 
 
 # ===== TABS =====
 
-tab1, tab2, tab3, tab4 = st.tabs([
+# st.tabs runs every tab body on each rerun, so pick the tab with a radio
+# and only build the figures for the one being viewed
+TAB_LABELS = [
     "📈 Main Timeline",
     "🥪 Sandwich View",
     "📊 Thermal Gradient",
     "🔍 Diagnostic Overlay"
-])
+]
+active_tab = st.radio(
+    "View",
+    options=TAB_LABELS,
+    horizontal=True,
+    label_visibility='collapsed',
+    key='active_tab'
+)
 
 
 # ----- TAB 1: MAIN TIMELINE -----
-with tab1:
+if active_tab == TAB_LABELS[0]:
     st.header("Main Timeline")
     st.info("💡 **Tip:** Click on any line name in the legend to hide/show it on the plot")
     
+    # Wall type change events for the experimental box (shared by figure and expander)
+    wall_changes = get_wall_type_changes(period_option, excluded_pairs, box_id=2) if filtered_wall is not None else []
+    
     if view_level == 'Box Average':
         st.markdown("""
         **Box-Level Temperature Comparison**
@@ -317,14 +445,17 @@ with tab1:
         - Vertical lines: Wall type changes in Experimental box
         """)
         
-        if filtered_box is not None:
+        if timeline_box is not None:
             fig = plot_timeline_box(
-                filtered_box,
+                timeline_box,
                 normalized=normalized,
                 smoothing=smoothing_option,
                 include_room=include_room,
-                include_surface=include_surface
+                include_surface=include_surface,
+                changes=wall_changes,
             )
+            # Keep zoom/legend state across reruns until the period or scale changes
+            fig.update_layout(uirevision=f"box-{period_option}-{normalized}", legend=dict(uirevision='legend'))
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("No box-level data available.")
@@ -341,39 +472,53 @@ with tab1:
         if filtered_box is not None:
             box_subset = filtered_box[filtered_box['box_id'] == selected_box_detail]
             
-            fig = go.Figure()
-            
             # Use distinct colors regardless of box
             internal_color = '#2E86AB'  # Blue
             inside_surf_color = '#E63946'  # Red
             outside_surf_color = '#F77F00'  # Orange
             
+            # Collect traces and the zero line first and build the figure once
+            traces = []
+            shapes = []
+            annotations = []
+            
             # Internal temp (solid)
-            fig.add_trace(go.Scatter(
-                x=box_subset['timestamp'],
-                y=box_subset['internal_temp'] if not normalized else box_subset['normalized_internal'],
+            x, y = downsample_lttb(
+                box_subset['timestamp'],
+                box_subset['internal_temp'] if not normalized else box_subset['normalized_internal']
+            )
+            traces.append(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines',
                 name='Internal Temp',
                 line=dict(color=internal_color, width=2.5),
             ))
             
             # Inside surface (dashed)
-            fig.add_trace(go.Scatter(
-                x=box_subset['timestamp'],
-                y=box_subset['surface_temp'] if not normalized else box_subset['normalized_surface'],
+            x, y = downsample_lttb(
+                box_subset['timestamp'],
+                box_subset['surface_temp'] if not normalized else box_subset['normalized_surface']
+            )
+            traces.append(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines',
                 name='Inside Surface',
                 line=dict(color=inside_surf_color, width=2, dash='dash'),
             ))
             
-            # Outside surface (dotted) - need to get from wall data
-            if filtered_wall is not None:
-                wall_subset = filtered_wall[filtered_wall['box_id'] == selected_box_detail]
-                out_surf_avg = wall_subset.groupby('timestamp')['out_surface' if not normalized else 'out_normalized_surface'].mean().reset_index()
+            # Outside surface (dotted) - precomputed wall average per box
+            if filtered_box_outside is not None:
+                out_surf_avg = filtered_box_outside[filtered_box_outside['box_id'] == selected_box_detail]
+                x, y = downsample_lttb(
+                    out_surf_avg['timestamp'],
+                    out_surf_avg['out_surface' if not normalized else 'out_normalized_surface']
+                )
                 
-                fig.add_trace(go.Scatter(
-                    x=out_surf_avg['timestamp'],
-                    y=out_surf_avg['out_surface' if not normalized else 'out_normalized_surface'],
+                traces.append(go.Scattergl(
+                    x=x,
+                    y=y,
                     mode='lines',
                     name='Outside Surface',
                     line=dict(color=outside_surf_color, width=2, dash='dot'),
@@ -381,47 +526,30 @@ with tab1:
             
             # Room temp or 0 line
             if not normalized:
-                fig.add_trace(go.Scatter(
-                    x=box_subset['timestamp'],
-                    y=box_subset['room_temp'],
+                x, y = downsample_lttb(box_subset['timestamp'], box_subset['room_temp'])
+                traces.append(go.Scattergl(
+                    x=x,
+                    y=y,
                     mode='lines',
                     name='Room Temperature (Outside Air)',
                     line=dict(color=ROOM_TEMP_COLOR, width=2),
                 ))
             else:
-                fig.add_hline(
-                    y=0,
-                    line_dash="dot",
-                    line_color=ROOM_TEMP_COLOR,
-                    line_width=2,
-                    annotation_text="Out Air Temp (Room) = 0°C",
-                    annotation_position="right"
-                )
+                shapes.append(dict(
+                    type='line',
+                    xref='paper', x0=0, x1=1,
+                    yref='y', y0=0, y1=0,
+                    line=dict(color=ROOM_TEMP_COLOR, width=2, dash='dot'),
+                ))
+                annotations.append(dict(
+                    xref='paper', x=1,
+                    yref='y', y=0,
+                    text="Out Air Temp (Room) = 0°C",
+                    showarrow=False,
+                    xanchor='left',
+                ))
             
-            # Add wall type changes for experimental box
-            if selected_box_detail == 2 and filtered_wall is not None:
-                exp_data = filtered_wall[filtered_wall['box_id'] == 2]
-                if 'wall_type' in exp_data.columns:
-                    from src.transform import detect_wall_type_changes
-                    changes = detect_wall_type_changes(exp_data)
-                    for ts, wall_type in changes:
-                        fig.add_vline(
-                            x=ts,
-                            line_width=2,
-                            line_dash="solid",
-                            line_color="rgba(128, 128, 128, 0.4)",
-                        )
-                        # Add annotation separately to avoid timestamp arithmetic issues
-                        fig.add_annotation(
-                            x=ts,
-                            y=1,
-                            yref='paper',
-                            text=f"→ {wall_type}",
-                            showarrow=False,
-                            yshift=10,
-                            font=dict(size=10, color="black"),
-                            bgcolor="rgba(255, 255, 255, 0.8)",
-                        )
+            fig = go.Figure(data=traces)
             
             fig.update_layout(
                 title=f"{'Control' if selected_box_detail == 1 else 'Experimental'} Box - Complete Temperature Profile" + (" (Normalized)" if normalized else ""),
@@ -429,9 +557,16 @@ with tab1:
                 yaxis_title='Temperature Relative to Room (°C)' if normalized else 'Temperature (°C)',
                 hovermode='x unified',
                 height=500,
-                legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+                legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1, uirevision='legend'),
+                uirevision=f"{period_option}-{selected_box_detail}-{normalized}",
+                shapes=shapes,
+                annotations=annotations,
             )
             
+            # Add wall type changes for experimental box
+            if selected_box_detail == 2:
+                add_wall_type_markers(fig, wall_changes)
+            
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("No box-level data available.")
@@ -445,16 +580,18 @@ with tab1:
         - Each color represents a different wall (1-4)
         """)
         
-        if filtered_wall is not None and selected_walls:
+        if timeline_wall is not None and selected_walls:
             fig = plot_timeline_wall(
-                filtered_wall,
+                timeline_wall,
                 walls=selected_walls,
                 box_id=selected_box,
                 smoothing=smoothing_option,
                 show_internal=show_internal,
                 show_in_surface=show_in_surface,
-                show_out_surface=show_out_surface
+                show_out_surface=show_out_surface,
+                changes=wall_changes,
             )
+            fig.update_layout(uirevision=f"walls-{period_option}-{selected_box}", legend=dict(uirevision='legend'))
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("No wall-level data available or no walls selected.")
@@ -468,13 +605,15 @@ with tab1:
         - Different colors for Control (blue tones) vs Experimental (orange/red tones)
         """)
         
-        if filtered_wall is not None:
+        if timeline_wall is not None:
             fig = plot_timeline_wall_comparison(
-                filtered_wall,
+                timeline_wall,
                 wall_id=selected_wall,
                 normalized=normalized,
-                smoothing=smoothing_option
+                smoothing=smoothing_option,
+                changes=get_wall_type_changes(period_option, excluded_pairs, box_id=2, wall_id=selected_wall),
             )
+            fig.update_layout(uirevision=f"compare-{period_option}-{selected_wall}-{normalized}", legend=dict(uirevision='legend'))
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("No wall-level data available.")
@@ -484,17 +623,15 @@ with tab1:
                                       (view_level == 'Individual Walls (One Box)' and selected_box == 2) or
                                       view_level == 'Wall Comparison (Both Boxes)'):
         with st.expander("🔄 Wall Type Change Events (Experimental Box)"):
-            changes = detect_wall_type_changes(filtered_wall[filtered_wall['box_id'] == 2])
-            
-            if changes:
-                change_df = pd.DataFrame(changes, columns=['Timestamp', 'Wall Type'])
+            if wall_changes:
+                change_df = pd.DataFrame(wall_changes, columns=['Timestamp', 'Wall Type'])
                 st.dataframe(change_df, use_container_width=True)
             else:
                 st.info("No wall type changes detected.")
 
 
 # ----- TAB 2: SANDWICH VIEW -----
-with tab2:
+if active_tab == TAB_LABELS[1]:
     st.header("Sandwich View - Thermal Transfer Analysis by Wall Type")
     
     st.info("""
@@ -523,7 +660,7 @@ with tab2:
 
 
 # ----- TAB 3: THERMAL GRADIENT -----
-with tab3:
+if active_tab == TAB_LABELS[2]:
     st.header("Thermal Gradient Summary")
     st.markdown("""
     **Temperature Gradients by Wall Type**
@@ -558,8 +695,8 @@ with tab3:
         if 'wall_type' in gradient_wall_data.columns:
             # Original summary plot (mean values)
             st.subheader("📊 Mean Temperature Gradients")
-            fig = plot_thermal_gradient_summary(gradient_wall_data, periods=gradient_periods)
-            st.plotly_chart(fig, use_container_width=True)
+            fig_json = get_gradient_summary_json(tuple(gradient_periods), excluded_pairs)
+            st.plotly_chart(json.loads(fig_json), use_container_width=True)
             
             # New: Normalized delta view (time series)
             st.markdown("---")
@@ -631,7 +768,7 @@ with tab3:
 
 
 # ----- TAB 4: DIAGNOSTIC OVERLAY -----
-with tab4:
+if active_tab == TAB_LABELS[3]:
     st.header("Diagnostic Overlay - All Sensors")
     st.markdown("*All 16 sensors visualized with box average*")
     
@@ -653,7 +790,7 @@ with tab4:
         
         # Get available sensors for this box
         if filtered_sensor is not None:
-            box_sensors = sorted(filtered_sensor[filtered_sensor['box_id'] == diag_box]['sensor_id'].unique())
+            box_sensors = excluded_data['sensors_by_period_box'].get((period_option, diag_box), [])
         else:
             box_sensors = list(range(1, 17))
         
@@ -703,7 +840,7 @@ with tab4:
             st.plotly_chart(fig, use_container_width=True)
             
             # Show sensor availability
-            available_sensors = sorted(filtered_sensor[filtered_sensor['box_id'] == diag_box]['sensor_id'].unique())
+            available_sensors = box_sensors
             missing_sensors = [s for s in range(1, 17) if s not in available_sensors]
             
             st.info(f"**Displaying {len(selected_sensors)} sensors** | Available: {', '.join(map(str, available_sensors))}")
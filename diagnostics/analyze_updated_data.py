@@ -4,6 +4,7 @@ Analyzes Period1 and Period2 CSV files for completeness and date ranges.
 """
 
 import pandas as pd
+import numpy as np
 from pathlib import Path
 import sys
 import logging
@@ -11,23 +12,45 @@ import logging
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.logger_csv import read_raw_csv
+from src.parallel import parallel_map
+
 # Temporarily disable the load.py logging to avoid emoji issues
 logging.getLogger('src.load').setLevel(logging.CRITICAL)
 
+# Logger timestamp format (e.g. 10/23/2025 12:03)
+DATE_FORMAT = '%m/%d/%Y %H:%M'
+
+# Expected data window of each period
+PERIOD_RANGES = {
+    # October 23 to November 6, 2025
+    'Period1': (pd.Timestamp('2025-10-23'), pd.Timestamp('2025-11-06 23:59:59')),
+    # December 3 after 11:00:00 to December 11 before 12:00:00, 2025
+    'Period2': (pd.Timestamp('2025-12-03 11:00:00'), pd.Timestamp('2025-12-11 11:59:59')),
+}
+
+# Same bounds as datetime64, for comparing raw date arrays
+_PERIOD_BOUNDS = {
+    period: (np.datetime64(start), np.datetime64(end))
+    for period, (start, end) in PERIOD_RANGES.items()
+}
+
+
+def parse_dates(values):
+    """
+    Parse timestamps with the known logger format (fast C path).
+    Falls back to pandas' format inference if any value does not match.
+    """
+    dates = pd.to_datetime(values, format=DATE_FORMAT, errors='coerce')
+    if dates.isna().sum() > values.isna().sum():
+        dates = pd.to_datetime(values, errors='coerce')
+    return dates
+
 
 def load_csv_simple(filepath):
     """Load CSV file without logging."""
     try:
-        df = None
-        for encoding in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
-            try:
-                df = pd.read_csv(filepath, header=14, encoding=encoding)
-                break
-            except (UnicodeDecodeError, Exception):
-                continue
-        
-        if df is None:
-            return None
+        df = read_raw_csv(filepath)
         
         # Clean column names
         df.columns = df.columns.str.strip().str.lower()
@@ -42,17 +65,9 @@ def load_csv_simple(filepath):
         if date_col is None:
             date_col = df.columns[0]
         
-        # Clean data - stop at rows with too many NaN
-        clean_rows = []
-        for idx, row in df.iterrows():
-            if row.isna().sum() >= 2:  # If 2+ required columns missing
-                break
-            clean_rows.append(idx)
-        
-        if clean_rows:
-            df = df.loc[clean_rows].copy()
-        
-        return df
+        # Clean data - drop the trailing junk rows (2+ required columns missing).
+        # The header's sample count is unreliable (roll-over), so it can't serve as nrows.
+        return df.dropna(thresh=len(df.columns) - 1)
     
     except Exception:
         return None
@@ -74,7 +89,33 @@ def analyze_file(filepath):
         
         # Extract info
         date_col = df.columns[0]  # First column is date
-        dates = pd.to_datetime(df[date_col], errors='coerce')
+        dates = parse_dates(df[date_col])
+        
+        # Rows indexed by timestamp (sorted, first row per timestamp) for nearest-time lookups
+        by_time = df.set_index(pd.DatetimeIndex(dates))
+        by_time = by_time[by_time.index.notna()].sort_index(kind='stable')
+        by_time = by_time[~by_time.index.duplicated()]
+        
+        # Resolve the value columns once per file (room temp is the first air temp column)
+        value_cols = {'surface': None, 'internal': None, 'air': None, 'wall_type': None}
+        for col in df.columns:
+            name = col.lower()
+            if 'surface' in name and 'heat' in name:
+                value_cols['surface'] = col
+            elif 'internal' in name and 'temp' in name:
+                value_cols['internal'] = col
+            elif 'air' in name and 'temp' in name:
+                value_cols['air'] = col
+            elif 'wall' in name and 'type' in name:
+                value_cols['wall_type'] = col
+        value_cols['room'] = next((c for c in df.columns if 'air' in c.lower() and 'temp' in c.lower()), None)
+        
+        # Sensor number from the filename (e.g. GW_1.10_111025.csv -> 10)
+        filename = filepath.name
+        sensor = filename.split('.')[1].split('_')[0] if '.' in filename else '?'
+        
+        # One pass over the null mask for both null stats
+        null_count = int(df.isna().to_numpy().sum())
         
         return {
             'filepath': filepath,
@@ -82,11 +123,15 @@ def analyze_file(filepath):
             'rows': len(df),
             'min_date': dates.min(),
             'max_date': dates.max(),
-            'has_nulls': df.isnull().any().any(),
-            'null_count': df.isnull().sum().sum(),
+            'has_nulls': null_count > 0,
+            'null_count': null_count,
             'date_column': date_col,
             'data': df,
-            'dates': dates
+            'dates': dates,
+            'by_time': by_time,
+            'times': by_time.index.to_numpy(),
+            'cols': value_cols,
+            'sensor': sensor
         }
     
     except Exception as e:
@@ -98,29 +143,124 @@ def analyze_file(filepath):
         }
 
 
+def probe_first_date(filepath):
+    """First timestamp of a CSV file, read from its first data row only (None if unknown)."""
+    try:
+        # Dates are plain ASCII, so latin-1 is safe without sniffing
+        first_row = pd.read_csv(filepath, header=14, nrows=1, encoding='latin-1')
+        first_date = parse_dates(first_row.iloc[:, 0]).iloc[0]
+        return None if pd.isna(first_date) else first_date
+    except Exception:
+        return None
+
+
+def analyze_file_quick(filepath, period):
+    """
+    Analyze a file unless its first timestamp is more than a week after the
+    period ends, in which case it cannot contribute valid rows and the full
+    parse is skipped.
+    """
+    _, end = PERIOD_RANGES.get(period, PERIOD_RANGES['Period2'])
+    first_date = probe_first_date(filepath)
+    
+    if first_date is not None and first_date > end + pd.Timedelta(days=7):
+        return {
+            'filepath': filepath,
+            'status': 'SKIPPED',
+            'error': f'Starts {first_date}, after the period ends',
+            'rows': 0
+        }
+    
+    return analyze_file(filepath)
+
+
+def rows_near(r, targets, tolerance=pd.Timedelta(minutes=5)):
+    """
+    Rows of an analyzed file closest to each target time (within tolerance),
+    None where there is no such row. All targets share one binary search.
+    """
+    times = r['times']
+    if len(times) == 0:
+        return [None] * len(targets)
+    targets = pd.DatetimeIndex(targets).to_numpy()
+    
+    # Nearest of the two sorted times around each target (the earlier one on ties)
+    pos = np.searchsorted(times, targets, side='left')
+    before = np.clip(pos - 1, 0, len(times) - 1)
+    after = np.clip(pos, 0, len(times) - 1)
+    nearest = np.where(np.abs(targets - times[before]) <= np.abs(times[after] - targets), before, after)
+    found = np.abs(times[nearest] - targets) <= np.timedelta64(tolerance)
+    
+    return [r['by_time'].iloc[i] if ok else None for i, ok in zip(nearest, found)]
+
+
 def check_date_range(dates, period):
     """Check if dates fall within expected range."""
-    if period == 'Period1':
-        # October 23 to November 6, 2025
-        start = pd.Timestamp('2025-10-23')
-        end = pd.Timestamp('2025-11-06 23:59:59')
-    else:  # Period2
-        # December 3 after 11:00:00 to December 11 before 12:00:00, 2025
-        start = pd.Timestamp('2025-12-03 11:00:00')
-        end = pd.Timestamp('2025-12-11 11:59:59')
-    
-    valid_dates = dates[(dates >= start) & (dates <= end)]
-    invalid_dates = dates[(dates < start) | (dates > end)]
+    start, end = _PERIOD_BOUNDS.get(period, _PERIOD_BOUNDS['Period2'])
+    
+    # Compare on the raw datetime64 array (NaT is neither valid nor invalid)
+    values = dates.to_numpy()
+    valid_mask = (values >= start) & (values <= end)
+    invalid_mask = (values < start) | (values > end)
+    valid_count = int(valid_mask.sum())
+    invalid_count = int(invalid_mask.sum())
     
     return {
-        'valid_count': len(valid_dates),
-        'invalid_count': len(invalid_dates),
+        'valid_count': valid_count,
+        'invalid_count': invalid_count,
         'total_count': len(dates),
-        'percent_valid': (len(valid_dates) / len(dates) * 100) if len(dates) > 0 else 0,
-        'invalid_dates': invalid_dates.tolist() if len(invalid_dates) < 10 else None
+        'percent_valid': (valid_count / len(dates) * 100) if len(dates) > 0 else 0,
+        'invalid_dates': dates[invalid_mask].tolist() if invalid_count < 10 else None
     }
 
 
+def print_box_samples(title, files, rows, max_room_file, min_room_file):
+    """Print the sample row (by filename in rows, None if missing) of each file of a box."""
+    print(f"{title} - {len(files)} files:")
+    print(f"{'-'*100}")
+    print(f"{'Sensor':<8} {'File':<30} {'Surface Temp':<15} {'Internal Temp':<15} {'Room Temp':<12} {'Wall Type':<15} {'Flags':<20}")
+    print(f"{'-'*100}")
+    
+    for r in files:
+        filename = r['filepath'].name
+        sensor = r['sensor']
+        cols = r['cols']
+        
+        row = rows[filename]
+        
+        if row is not None:
+            # Extract values
+            surface = row.get(cols['surface'], 'N/A') if cols['surface'] else 'N/A'
+            internal = row.get(cols['internal'], 'N/A') if cols['internal'] else 'N/A'
+            room = row.get(cols['air'], 'N/A') if cols['air'] else 'N/A'
+            wall_type = row.get(cols['wall_type'], 'N/A') if cols['wall_type'] else 'N/A'
+            
+            # Format values
+            if pd.isna(surface):
+                surface = 'N/A'
+            if pd.isna(internal):
+                internal = 'N/A'
+            if pd.isna(room):
+                room = 'N/A'
+            if pd.isna(wall_type):
+                wall_type = 'N/A'
+            else:
+                wall_type = str(wall_type).strip()
+            
+            # Flags
+            flags = []
+            if filename == max_room_file:
+                flags.append("MAX ROOM TEMP")
+            if filename == min_room_file:
+                flags.append("MIN ROOM TEMP")
+            flag_str = ', '.join(flags)
+            
+            print(f"S{sensor:<7} {filename:<30} {str(surface):<15} {str(internal):<15} {str(room):<12} {wall_type:<15} {flag_str:<20}")
+        else:
+            print(f"S{sensor:<7} {filename:<30} {'NO DATA':<15} {'NO DATA':<15} {'NO DATA':<12} {'NO DATA':<15} {'':<20}")
+    
+
+
 def analyze_period(period_path, period_name):
     """Analyze all files in a period folder."""
     print(f"\n{'='*80}")
@@ -135,29 +275,39 @@ def analyze_period(period_path, period_name):
     
     print(f"Found {len(csv_files)} CSV files\n")
     
-    results = []
-    for csv_file in csv_files:
-        result = analyze_file(csv_file)
-        results.append(result)
+    # Files are independent, so parse them in parallel (results keep file order)
+    results = parallel_map(analyze_file_quick, csv_files, period_name)
     
     # Summary by status
     success_files = [r for r in results if r['status'] == 'SUCCESS']
-    failed_files = [r for r in results if r['status'] != 'SUCCESS']
+    skipped_files = [r for r in results if r['status'] == 'SKIPPED']
+    failed_files = [r for r in results if r['status'] not in ('SUCCESS', 'SKIPPED')]
     
     print(f"OVERALL SUMMARY")
     print(f"{'-'*80}")
     print(f"  Total files: {len(results)}")
     print(f"  [+] Successfully parsed: {len(success_files)}")
     print(f"  [-] Failed to parse: {len(failed_files)}")
+    if skipped_files:
+        print(f"  [!] Skipped (outside period): {len(skipped_files)}")
     
     if failed_files:
         print(f"\n[X] FAILED FILES:")
         for f in failed_files:
             print(f"  - {f['filepath'].name}: {f.get('error', 'Unknown error')}")
     
+    if skipped_files:
+        print(f"\n[!] SKIPPED FILES:")
+        for f in skipped_files:
+            print(f"  - {f['filepath'].name}: {f['error']}")
+    
     if not success_files:
         return
     
+    # Check each file's dates once; reused by the per-box and per-wall summaries
+    for r in success_files:
+        r['date_check'] = check_date_range(r['dates'], period_name)
+    
     # Date range analysis
     print(f"\nDATE RANGE ANALYSIS")
     print(f"{'-'*80}")
@@ -165,8 +315,7 @@ def analyze_period(period_path, period_name):
     date_results = []
     for r in success_files:
         filename = r['filepath'].name
-        dates = r['dates']
-        date_check = check_date_range(dates, period_name)
+        date_check = r['date_check']
         
         date_results.append({
             'filename': filename,
@@ -202,13 +351,13 @@ def analyze_period(period_path, period_name):
     print(f"Box 1 (Control):")
     print(f"  Files: {len(box1_files)}/16 expected")
     print(f"  Total rows: {sum(r['rows'] for r in box1_files):,}")
-    box1_valid = sum(check_date_range(r['dates'], period_name)['valid_count'] for r in box1_files)
+    box1_valid = sum(r['date_check']['valid_count'] for r in box1_files)
     print(f"  Valid date rows: {box1_valid:,}")
     
     print(f"\nBox 2 (Experimental):")
     print(f"  Files: {len(box2_files)}/16 expected")
     print(f"  Total rows: {sum(r['rows'] for r in box2_files):,}")
-    box2_valid = sum(check_date_range(r['dates'], period_name)['valid_count'] for r in box2_files)
+    box2_valid = sum(r['date_check']['valid_count'] for r in box2_files)
     print(f"  Valid date rows: {box2_valid:,}")
     
     # Per-wall analysis
@@ -234,7 +383,7 @@ def analyze_period(period_path, period_name):
                          if f"{box_id}." in r['filepath'].name 
                          and any(f"{box_id}.{s}_" in r['filepath'].name for s in sensors)]
             
-            wall_valid = sum(check_date_range(r['dates'], period_name)['valid_count'] for r in wall_files)
+            wall_valid = sum(r['date_check']['valid_count'] for r in wall_files)
             print(f"  {box_name}: {len(wall_files)}/4 files, {wall_valid:,} valid rows")
     
     # Rows per day analysis
@@ -247,7 +396,9 @@ def analyze_period(period_path, period_name):
     dates_clean = dates.dropna()
     
     if len(dates_clean) > 0:
-        days = dates_clean.dt.date.value_counts().sort_index()
+        # Count rows per calendar day on the datetime64 array (no per-row date objects)
+        day_ids, day_counts = np.unique(dates_clean.to_numpy().astype('datetime64[D]'), return_counts=True)
+        days = pd.Series(day_counts, index=pd.to_datetime(day_ids).date)
         
         print(f"Sample file: {sample['filepath'].name}")
         print(f"Expected: 144 rows/day (10-minute intervals)")
@@ -300,21 +451,38 @@ def analyze_period(period_path, period_name):
     # Get all unique dates from first successful file
     if success_files:
         sample_dates = success_files[0]['dates'].dropna()
-        unique_days = sample_dates.dt.date.unique()
+        sample_days = sample_dates.to_numpy().astype('datetime64[D]')
+        unique_days = np.unique(sample_days)
         
         import random
         random.seed(42)  # For reproducibility
         
-        for day in sorted(unique_days):
+        # Group files by box (same for every day)
+        sample_box1_files = sorted([r for r in success_files if ('GW1.' in r['filepath'].name or '_1.' in r['filepath'].name)], 
+                                   key=lambda x: x['filepath'].name)
+        sample_box2_files = sorted([r for r in success_files if ('GW2.' in r['filepath'].name or '_2.' in r['filepath'].name)], 
+                                   key=lambda x: x['filepath'].name)
+        
+        # Sample timestamp of each day
+        day_samples = []
+        for day in unique_days:
             # Get all timestamps for this day
-            day_timestamps = sample_dates[sample_dates.dt.date == day]
+            day_timestamps = sample_dates[sample_days == day]
             
             if len(day_timestamps) == 0:
                 continue
             
             # Pick timestamp closest to noon
-            noon = pd.Timestamp(day.year, day.month, day.day, 12, 0, 0)
-            closest_ts = min(day_timestamps.tolist(), key=lambda x: abs((x - noon).total_seconds()))
+            noon = pd.Timestamp(day) + pd.Timedelta(hours=12)
+            offsets = np.abs(day_timestamps.to_numpy() - noon.to_datetime64())
+            day_samples.append((day, day_timestamps.iloc[int(offsets.argmin())]))
+        
+        # Closest row within 5 minutes of every sample timestamp, one lookup per file
+        sample_times = [ts for _, ts in day_samples]
+        rows_by_file = {r['filepath'].name: rows_near(r, sample_times) for r in success_files}
+        
+        for i, (day, closest_ts) in enumerate(day_samples):
+            day_rows = {filename: rows[i] for filename, rows in rows_by_file.items()}
             
             print(f"\n{'='*100}")
             print(f"Day: {day} | Sample Timestamp: {closest_ts}")
@@ -326,26 +494,10 @@ def analyze_period(period_path, period_name):
             # First pass: collect all data
             for r in success_files:
                 filename = r['filepath'].name
-                df = r['data']
-                dates = r['dates']
-                
-                # Find row within 5 minutes of target timestamp
-                time_window_mask = (dates >= closest_ts - pd.Timedelta(minutes=5)) & \
-                                   (dates <= closest_ts + pd.Timedelta(minutes=5))
-                matching_rows = dates[time_window_mask]
+                row = day_rows[filename]
                 
-                if len(matching_rows) > 0:
-                    # Use closest timestamp
-                    closest_idx = (matching_rows - closest_ts).abs().idxmin()
-                    row = df.loc[closest_idx]
-                    
-                    # Find room temp column
-                    room_col = None
-                    for col in df.columns:
-                        if 'air' in col.lower() and 'temp' in col.lower():
-                            room_col = col
-                            break
-                    
+                if row is not None:
+                    room_col = r['cols']['room']
                     if room_col and pd.notna(row.get(room_col)):
                         room_temps[filename] = float(row[room_col])
             
@@ -353,131 +505,8 @@ def analyze_period(period_path, period_name):
             max_room_file = max(room_temps.items(), key=lambda x: x[1])[0] if room_temps else None
             min_room_file = min(room_temps.items(), key=lambda x: x[1])[0] if room_temps else None
             
-            # Group files by box
-            box1_files = sorted([r for r in success_files if ('GW1.' in r['filepath'].name or '_1.' in r['filepath'].name)], 
-                               key=lambda x: x['filepath'].name)
-            box2_files = sorted([r for r in success_files if ('GW2.' in r['filepath'].name or '_2.' in r['filepath'].name)], 
-                               key=lambda x: x['filepath'].name)
-            
-            # Print Box 1
-            print(f"\nBox 1 (CONTROL) - {len(box1_files)} files:")
-            print(f"{'-'*100}")
-            print(f"{'Sensor':<8} {'File':<30} {'Surface Temp':<15} {'Internal Temp':<15} {'Room Temp':<12} {'Wall Type':<15} {'Flags':<20}")
-            print(f"{'-'*100}")
-            
-            for r in box1_files:
-                filename = r['filepath'].name
-                df = r['data']
-                dates = r['dates']
-                
-                # Extract sensor number
-                sensor = filename.split('.')[1].split('_')[0] if '.' in filename else '?'
-                
-                # Find row within 5 minutes
-                time_window_mask = (dates >= closest_ts - pd.Timedelta(minutes=5)) & \
-                                   (dates <= closest_ts + pd.Timedelta(minutes=5))
-                matching_rows = dates[time_window_mask]
-                
-                if len(matching_rows) > 0:
-                    closest_idx = (matching_rows - closest_ts).abs().idxmin()
-                    row = df.loc[closest_idx]
-                    
-                    # Extract values
-                    surface = internal = room = wall_type = 'N/A'
-                    
-                    for col in df.columns:
-                        if 'surface' in col.lower() and 'heat' in col.lower():
-                            surface = row.get(col, 'N/A')
-                        elif 'internal' in col.lower() and 'temp' in col.lower():
-                            internal = row.get(col, 'N/A')
-                        elif 'air' in col.lower() and 'temp' in col.lower():
-                            room = row.get(col, 'N/A')
-                        elif 'wall' in col.lower() and 'type' in col.lower():
-                            wall_type = row.get(col, 'N/A')
-                    
-                    # Format values
-                    if pd.isna(surface):
-                        surface = 'N/A'
-                    if pd.isna(internal):
-                        internal = 'N/A'
-                    if pd.isna(room):
-                        room = 'N/A'
-                    if pd.isna(wall_type):
-                        wall_type = 'N/A'
-                    else:
-                        wall_type = str(wall_type).strip()
-                    
-                    # Flags
-                    flags = []
-                    if filename == max_room_file:
-                        flags.append("MAX ROOM TEMP")
-                    if filename == min_room_file:
-                        flags.append("MIN ROOM TEMP")
-                    flag_str = ', '.join(flags)
-                    
-                    print(f"S{sensor:<7} {filename:<30} {str(surface):<15} {str(internal):<15} {str(room):<12} {wall_type:<15} {flag_str:<20}")
-                else:
-                    print(f"S{sensor:<7} {filename:<30} {'NO DATA':<15} {'NO DATA':<15} {'NO DATA':<12} {'NO DATA':<15} {'':<20}")
-            
-            # Print Box 2
-            print(f"\n\nBox 2 (EXPERIMENTAL) - {len(box2_files)} files:")
-            print(f"{'-'*100}")
-            print(f"{'Sensor':<8} {'File':<30} {'Surface Temp':<15} {'Internal Temp':<15} {'Room Temp':<12} {'Wall Type':<15} {'Flags':<20}")
-            print(f"{'-'*100}")
-            
-            for r in box2_files:
-                filename = r['filepath'].name
-                df = r['data']
-                dates = r['dates']
-                
-                # Extract sensor number
-                sensor = filename.split('.')[1].split('_')[0] if '.' in filename else '?'
-                
-                # Find row within 5 minutes
-                time_window_mask = (dates >= closest_ts - pd.Timedelta(minutes=5)) & \
-                                   (dates <= closest_ts + pd.Timedelta(minutes=5))
-                matching_rows = dates[time_window_mask]
-                
-                if len(matching_rows) > 0:
-                    closest_idx = (matching_rows - closest_ts).abs().idxmin()
-                    row = df.loc[closest_idx]
-                    
-                    # Extract values
-                    surface = internal = room = wall_type = 'N/A'
-                    
-                    for col in df.columns:
-                        if 'surface' in col.lower() and 'heat' in col.lower():
-                            surface = row.get(col, 'N/A')
-                        elif 'internal' in col.lower() and 'temp' in col.lower():
-                            internal = row.get(col, 'N/A')
-                        elif 'air' in col.lower() and 'temp' in col.lower():
-                            room = row.get(col, 'N/A')
-                        elif 'wall' in col.lower() and 'type' in col.lower():
-                            wall_type = row.get(col, 'N/A')
-                    
-                    # Format values
-                    if pd.isna(surface):
-                        surface = 'N/A'
-                    if pd.isna(internal):
-                        internal = 'N/A'
-                    if pd.isna(room):
-                        room = 'N/A'
-                    if pd.isna(wall_type):
-                        wall_type = 'N/A'
-                    else:
-                        wall_type = str(wall_type).strip()
-                    
-                    # Flags
-                    flags = []
-                    if filename == max_room_file:
-                        flags.append("MAX ROOM TEMP")
-                    if filename == min_room_file:
-                        flags.append("MIN ROOM TEMP")
-                    flag_str = ', '.join(flags)
-                    
-                    print(f"S{sensor:<7} {filename:<30} {str(surface):<15} {str(internal):<15} {str(room):<12} {wall_type:<15} {flag_str:<20}")
-                else:
-                    print(f"S{sensor:<7} {filename:<30} {'NO DATA':<15} {'NO DATA':<15} {'NO DATA':<12} {'NO DATA':<15} {'':<20}")
+            print_box_samples("\nBox 1 (CONTROL)", sample_box1_files, day_rows, max_room_file, min_room_file)
+            print_box_samples("\n\nBox 2 (EXPERIMENTAL)", sample_box2_files, day_rows, max_room_file, min_room_file)
 
 
 
@@ -6,56 +6,79 @@ Shows: files per period, rows, missing values, files per box and wall.
 import pandas as pd
 from pathlib import Path
 from collections import defaultdict
+import re
 import sys
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.logger_csv import read_raw_csv
+from src.parallel import parallel_map
+
 # Fix encoding for file output
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
-print("="*100)
-print("COMPREHENSIVE DIAGNOSTIC - CLEANED DATA")
-print("="*100)
+# Box and sensor numbers from names like GW_1.3_111025.csv / GW1.3_121125.csv
+_PAT = re.compile(r'(?:Period[12]_)?GW_?(\d+)\.(\d+)')
+
+# Wall 1 (South): S1,S2 (out), S9,S10 (in)
+# Wall 2 (East): S3,S4 (out), S11,S12 (in)
+# Wall 3 (North): S5,S6 (out), S13,S14 (in)
+# Wall 4 (West): S7,S8 (out), S15,S16 (in)
+_SENSOR_TO_WALL = {
+    1: 1, 2: 1, 9: 1, 10: 1,
+    3: 2, 4: 2, 11: 2, 12: 2,
+    5: 3, 6: 3, 13: 3, 14: 3,
+    7: 4, 8: 4, 15: 4, 16: 4,
+}
 
 def extract_box_sensor(filename):
     """Extract box and sensor from filename."""
-    # Remove period prefix if present
-    name = filename.replace('Period1_', '').replace('Period2_', '')
-    name = name.replace('.csv', '').replace('_121125', '').replace('_111025', '')
-    name = name.replace('GW_', '').replace('GW', '')
-    if '.' in name:
-        parts = name.split('.')
-        try:
-            box = int(parts[0])
-            sensor = int(parts[1])
-            # Determine wall based on sensor number
-            # Wall 1 (South): S1,S2 (out), S9,S10 (in)
-            # Wall 2 (East): S3,S4 (out), S11,S12 (in)
-            # Wall 3 (North): S5,S6 (out), S13,S14 (in)
-            # Wall 4 (West): S7,S8 (out), S15,S16 (in)
-            if sensor in [1, 2, 9, 10]:
-                wall = 1
-            elif sensor in [3, 4, 11, 12]:
-                wall = 2
-            elif sensor in [5, 6, 13, 14]:
-                wall = 3
-            elif sensor in [7, 8, 15, 16]:
-                wall = 4
-            else:
-                wall = None
-            return box, sensor, wall
-        except:
-            pass
-    return None, None, None
+    m = _PAT.search(filename)
+    if not m:
+        return None, None, None
+    box, sensor = int(m[1]), int(m[2])
+    return box, sensor, _SENSOR_TO_WALL.get(sensor)
 
-# Analyze cleaned data
-data_dir = Path('data_cleaned')
 
-for period in ['Period1', 'Period2']:
+def read_file_stats(csv_file):
+    """
+    Rows, date range and per-column missing counts of one CSV file's rows with a
+    valid timestamp. Returns None if the file has no date column, or {'error': ...}.
+    """
+    try:
+        df = read_raw_csv(csv_file, 'utf-8')
+        df.columns = df.columns.str.strip()
+        
+        # Find date column
+        date_col = next((c for c in df.columns if 'date' in c.lower() and 'time' in c.lower()), None)
+        if not date_col:
+            return None
+        
+        df['timestamp'] = pd.to_datetime(df[date_col], format='%m/%d/%Y %H:%M', errors='coerce')
+        df_clean = df.dropna(subset=['timestamp'])
+        
+        # Count missing values in each column (one vectorized pass)
+        missing_counts = df_clean.drop(columns=['timestamp']).isna().sum()
+        
+        return {
+            'rows': len(df_clean),
+            'start': df_clean['timestamp'].min(),
+            'end': df_clean['timestamp'].max(),
+            'missing': missing_counts[missing_counts > 0].to_dict(),
+        }
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def analyze_cleaned_period(data_dir, period):
+    """Print the diagnostic for one period folder. Returns the period's CSV files."""
     period_dir = data_dir / period
     
     if not period_dir.exists():
         print(f"\n{period}: Directory not found")
-        continue
+        return []
     
     print(f"\n{'='*100}")
     print(f"{period.upper()}")
@@ -65,7 +88,7 @@ for period in ['Period1', 'Period2']:
     
     if not csv_files:
         print("  No files found")
-        continue
+        return []
     
     # Collect file info
     file_info = {}
@@ -74,7 +97,8 @@ for period in ['Period1', 'Period2']:
     total_rows = 0
     total_missing = defaultdict(int)  # column -> missing count
     
-    for csv_file in csv_files:
+    # Files are independent, so parse them in parallel (results keep file order)
+    for csv_file, stats in zip(csv_files, parallel_map(read_file_stats, csv_files)):
         box, sensor, wall = extract_box_sensor(csv_file.name)
         
         if box:
@@ -82,45 +106,14 @@ for period in ['Period1', 'Period2']:
             if wall:
                 wall_counts[box][wall] += 1
         
-        # Read file
-        try:
-            df = pd.read_csv(csv_file, header=14, encoding='utf-8')
-            df.columns = df.columns.str.strip()
-            
-            # Find date column
-            date_col = next((c for c in df.columns if 'date' in c.lower() and 'time' in c.lower()), None)
-            
-            if date_col:
-                df['timestamp'] = pd.to_datetime(df[date_col], format='%m/%d/%Y %H:%M', errors='coerce')
-                df_clean = df.dropna(subset=['timestamp'])
-                
-                # Count missing values in each column
-                missing_info = {}
-                for col in df_clean.columns:
-                    if col != 'timestamp':
-                        missing_count = df_clean[col].isna().sum()
-                        if missing_count > 0:
-                            missing_info[col] = missing_count
-                            total_missing[col] += missing_count
-                
-                file_info[csv_file.name] = {
-                    'rows': len(df_clean),
-                    'start': df_clean['timestamp'].min(),
-                    'end': df_clean['timestamp'].max(),
-                    'missing': missing_info,
-                    'box': box,
-                    'sensor': sensor,
-                    'wall': wall
-                }
-                
-                total_rows += len(df_clean)
-        except Exception as e:
-            file_info[csv_file.name] = {
-                'error': str(e),
-                'box': box,
-                'sensor': sensor,
-                'wall': wall
-            }
+        if stats is None:
+            continue  # No date column
+        
+        file_info[csv_file.name] = {**stats, 'box': box, 'sensor': sensor, 'wall': wall}
+        if 'error' not in stats:
+            for col, missing_count in stats['missing'].items():
+                total_missing[col] += missing_count
+            total_rows += stats['rows']
     
     # Print summary statistics
     print(f"\n📊 SUMMARY STATISTICS")
@@ -198,20 +191,38 @@ for period in ['Period1', 'Period2']:
                             print(f" | MISSING: {missing_str}")
                         else:
                             print()
+    
+    return csv_files
 
-print(f"\n{'='*100}")
-print("DIAGNOSTIC COMPLETE")
-print(f"{'='*100}")
 
-# Final readiness check
-period1_exists = (data_dir / 'Period1').exists() and len(list((data_dir / 'Period1').glob('*.csv'))) > 0
-period2_exists = (data_dir / 'Period2').exists() and len(list((data_dir / 'Period2').glob('*.csv'))) > 0
+def main(data_dir=Path('data_cleaned')):
+    """Run the diagnostic for both periods of the cleaned data."""
+    print("="*100)
+    print("COMPREHENSIVE DIAGNOSTIC - CLEANED DATA")
+    print("="*100)
+    
+    # Analyze cleaned data
+    period_files = {}
+    for period in ['Period1', 'Period2']:
+        period_files[period] = analyze_cleaned_period(data_dir, period)
+    
+    print(f"\n{'='*100}")
+    print("DIAGNOSTIC COMPLETE")
+    print(f"{'='*100}")
+    
+    # Final readiness check
+    period1_exists = bool(period_files.get('Period1'))
+    period2_exists = bool(period_files.get('Period2'))
+    
+    print(f"\n✓ READINESS CHECK:")
+    if period1_exists and period2_exists:
+        print(f"  ✓ Both periods have data")
+        print(f"  ✓ Ready to proceed with load -> transform -> plot")
+    else:
+        print(f"  ⚠ Warning: Missing period data")
+    
+    print(f"\n{'='*100}")
 
-print(f"\n✓ READINESS CHECK:")
-if period1_exists and period2_exists:
-    print(f"  ✓ Both periods have data")
-    print(f"  ✓ Ready to proceed with load -> transform -> plot")
-else:
-    print(f"  ⚠ Warning: Missing period data")
 
-print(f"\n{'='*100}")
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,35 @@ Sets first timestamp to 12/03/2025 11:11:00 and increments by 10 minutes.
 """
 
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from pathlib import Path
+import io
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.logger_csv import floats_as_text, read_header_lines, read_logger_csv, sniff_encoding
+
+
+def frame_to_csv_text(df):
+    """
+    CSV text of the rows of df (no header), written by Arrow's C++ CSV writer, with
+    floats formatted as pandas writes them (floats_as_text) so '21.0' stays '21.0'.
+    Falls back to pandas if a value needs quoting, so the output stays unquoted.
+    """
+    buffer = io.BytesIO()
+    try:
+        pa_csv.write_csv(
+            pa.Table.from_pandas(floats_as_text(df), preserve_index=False), buffer,
+            write_options=pa_csv.WriteOptions(include_header=False, quoting_style='none')
+        )
+    except pa.ArrowInvalid:
+        return df.to_csv(index=False, header=False, lineterminator='\n')
+    return buffer.getvalue().decode('utf-8')
+
 
 # Files to fix
 files_to_fix = [
@@ -25,25 +53,19 @@ for filename in files_to_fix:
     
     print(f"\nProcessing: {filename}")
     
-    # Try different encodings
-    encoding = None
-    for enc in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
-        try:
-            with open(filepath, 'r', encoding=enc) as f:
-                lines = f.readlines()
-            encoding = enc
-            break
-        except UnicodeDecodeError:
-            continue
-    
-    if encoding is None:
-        print(f"  [X] Could not read file with any encoding")
-        continue
+    # Read the file once; sniff the encoding and keep the header lines
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    # The whole file is in memory, so the encoding is decided on all of it
+    encoding = sniff_encoding(raw)
+    # Header lines keep their original line endings for the rewrite
+    lines = read_header_lines(filepath, raw[:8192], encoding, 15, newline='')
+    header_lines = lines[:-1]
     
     print(f"  Encoding: {encoding}")
     
-    # Read the data part (header at row 14)
-    df = pd.read_csv(filepath, header=14, encoding=encoding)
+    # Read the data part (column header after the metadata lines)
+    df = read_logger_csv(io.BytesIO(raw), encoding, len(header_lines))
     
     # Find the date/time column
     date_col = None
@@ -62,19 +84,19 @@ for filename in files_to_fix:
     print(f"  Original last timestamp: {df[date_col].iloc[-1]}")
     
     # Generate new timestamps starting from 12/03/2025 11:11:00
-    start_time = pd.Timestamp('2025-12-03 11:11:00')
-    new_timestamps = [start_time + pd.Timedelta(minutes=10*i) for i in range(len(df))]
-    
-    # Format timestamps as M/D/YYYY H:MM (matching original format without seconds)
-    def format_timestamp(ts):
-        month = ts.month
-        day = ts.day
-        year = ts.year
-        hour = ts.hour
-        minute = ts.minute
-        return f"{month}/{day}/{year} {hour}:{minute:02d}"
-    
-    formatted_timestamps = [format_timestamp(ts) for ts in new_timestamps]
+    new_timestamps = pd.date_range('2025-12-03 11:11:00', periods=len(df), freq='10min')
+    
+    # Format timestamps as M/D/YYYY H:MM (matching original format without seconds).
+    # Built from the date fields with numpy's string kernels, because strftime has
+    # no portable unpadded month/day/hour
+    month = new_timestamps.month.to_numpy().astype(str)
+    day = new_timestamps.day.to_numpy().astype(str)
+    year = new_timestamps.year.to_numpy().astype(str)
+    hour = new_timestamps.hour.to_numpy().astype(str)
+    minute = np.char.zfill(new_timestamps.minute.to_numpy().astype(str), 2)
+    date_part = np.char.add(np.char.add(np.char.add(np.char.add(month, '/'), day), '/'), year)
+    time_part = np.char.add(np.char.add(hour, ':'), minute)
+    formatted_timestamps = np.char.add(np.char.add(date_part, ' '), time_part)
     
     # Update the dataframe
     df[date_col] = formatted_timestamps
@@ -84,16 +106,9 @@ for filename in files_to_fix:
     
     # Write back the file, preserving the header structure
     # Keep the first 14 lines (header lines) and write new data
+    # Assembled in memory (original header lines, column headers, data) and written once
     with open(filepath, 'w', encoding=encoding, newline='') as f:
-        # Write original header lines (first 14 lines)
-        for i in range(14):
-            f.write(lines[i])
-        
-        # Write the column headers
-        f.write(','.join(df.columns) + '\n')
-        
-        # Write the data
-        df.to_csv(f, index=False, header=False)
+        f.write(''.join(header_lines) + ','.join(df.columns) + '\n' + frame_to_csv_text(df))
     
     print(f"  [+] File updated successfully")
 
@@ -6,12 +6,15 @@ Reorganize data files correctly from data/updated folder:
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from pathlib import Path
+import csv
 import shutil
+import io
 
-print("="*100)
-print("DATA REORGANIZATION - PROCESSING data/updated FOLDER")
-print("="*100)
+from src.logger_csv import floats_as_text, read_header_lines, read_with_header_skip, sniff_encoding, stripped_names
+from src.parallel import parallel_map
 
 # Define date ranges
 PERIOD1_START = pd.Timestamp('2025-10-23')
@@ -19,251 +22,343 @@ PERIOD1_END = pd.Timestamp('2025-11-06 23:59:59')
 PERIOD2_START = pd.Timestamp('2025-12-03 11:00:00')
 PERIOD2_END = pd.Timestamp('2025-12-11 11:59:59')
 
-# Create output directories
-output_dir = Path('data_cleaned')
 
-# Clean up old directories if they exist
-for old_dir in [output_dir / 'Period1', output_dir / 'Period2', output_dir / 'Excluded']:
-    if old_dir.exists():
-        for f in old_dir.glob('*'):
-            f.unlink()
-
-period1_dir = output_dir / 'Period1'
-period2_dir = output_dir / 'Period2'
-excluded_dir = output_dir / 'Excluded'
-
-period1_dir.mkdir(parents=True, exist_ok=True)
-period2_dir.mkdir(parents=True, exist_ok=True)
-excluded_dir.mkdir(parents=True, exist_ok=True)
+def write_logger_csv(path, header_lines, df):
+    """
+    Write the metadata header_lines, then df (column header and rows) as utf-8 CSV.
+    The header is pre-joined and the rows come from Arrow's C++ CSV writer as bytes,
+    written straight to the file without a decode/encode round trip. Float columns
+    are written as pandas formats them (floats_as_text), keeping '21.0' as in the source.
+    Falls back to pandas (minimal quoting) if a value needs quoting.
+    """
+    header = (''.join(header_lines) + ','.join(df.columns) + '\n').encode('utf-8')
+    buffer = io.BytesIO()
+    try:
+        pa_csv.write_csv(
+            pa.Table.from_pandas(floats_as_text(df), preserve_index=False), buffer,
+            write_options=pa_csv.WriteOptions(include_header=False, quoting_style='none')
+        )
+        rows = buffer.getbuffer()
+    except pa.ArrowInvalid:
+        rows = df.to_csv(index=False, header=False, lineterminator='\n', quoting=csv.QUOTE_MINIMAL).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(rows)
 
-print(f"\nCreated fresh output directories:")
-print(f"  - {period1_dir}")
-print(f"  - {period2_dir}")
-print(f"  - {excluded_dir}")
 
-# Stats
-stats = {
-    'period1': {'files': [], 'rows': 0},
-    'period2': {'files': [], 'rows': 0},
-    'excluded': {'files': [], 'rows': 0}
-}
+def fast_copy(src, dst):
+    """
+    Copy file contents only. shutil.copyfile uses the OS zero-copy path (sendfile /
+    fcopyfile) or a 1 MiB buffer on Windows, and skips shutil.copy's permission-bit copy.
+    """
+    shutil.copyfile(src, dst)
 
-# Process Period1 folder from data/updated
-source_dir = Path('data/updated/Period1')
-print(f"\nProcessing data/updated/Period1...")
-print(f"{'='*100}")
 
-for csv_file in sorted(source_dir.glob('*.csv')):
-    print(f"\n  {csv_file.name}:")
+def read_rows_in_range(path, encoding, column_names, start, end, header_row=14, chunksize=50_000):
+    """
+    Stream a logger CSV in chunks and keep only the rows timestamped within [start, end].
+    The header line is skipped in favour of the already stripped column_names.
+    Returns (df, date_col, summary) where summary is (valid_rows, first, last) over the whole file.
+    """
+    kept = []
+    chunk = None
+    date_col = None
+    valid_rows, first, last = 0, None, None
     
-    try:
-        # Read file with multiple encoding attempts
-        df = None
-        for encoding in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
-            try:
-                df = pd.read_csv(csv_file, header=14, encoding=encoding)
-                break
-            except:
-                continue
-        
-        if df is None:
-            raise ValueError("Could not read file")
-        
-        df.columns = df.columns.str.strip()
-        
-        # Find date column
-        date_col = next((c for c in df.columns if 'date' in c.lower() and 'time' in c.lower()), None)
-        
-        if not date_col:
-            print(f"    ERROR: No date column - moving to excluded")
-            shutil.copy(csv_file, excluded_dir / f"Period1_{csv_file.name}")
-            stats['excluded']['files'].append(f"Period1_{csv_file.name}")
-            continue
-        
-        # Parse dates
-        df['timestamp'] = pd.to_datetime(df[date_col], format='%m/%d/%Y %H:%M', errors='coerce')
-        valid_df = df.dropna(subset=['timestamp'])
-        
-        if len(valid_df) == 0:
-            print(f"    ERROR: No valid timestamps - moving to excluded")
-            shutil.copy(csv_file, excluded_dir / f"Period1_{csv_file.name}")
-            stats['excluded']['files'].append(f"Period1_{csv_file.name}")
-            continue
+    reader = pd.read_csv(
+        path, skiprows=header_row + 1, header=None, names=column_names,
+        encoding=encoding, chunksize=chunksize, engine='c',
+    )
+    for chunk in reader:
+        if date_col is None:
+            date_col = next((c for c in chunk.columns if 'date' in c.lower() and 'time' in c.lower()), None)
+            if not date_col:
+                return chunk, None, None
         
-        orig_start = valid_df['timestamp'].min()
-        orig_end = valid_df['timestamp'].max()
-        print(f"    Date range: {orig_start} to {orig_end} ({len(valid_df)} rows)")
+        timestamps = pd.to_datetime(chunk[date_col], format='%m/%d/%Y %H:%M', errors='coerce')
+        chunk_valid = int(timestamps.notna().sum())
+        if chunk_valid:
+            valid_rows += chunk_valid
+            first = timestamps.min() if first is None else min(first, timestamps.min())
+            last = timestamps.max() if last is None else max(last, timestamps.max())
         
-        # Check if this belongs in Period1 (Oct 23 - Nov 6)
-        if orig_start >= PERIOD1_START and orig_end <= PERIOD1_END:
-            # Perfect Period1 file
-            print(f"    ✓ Belongs in Period1")
-            
-            # Copy file with filtered data
-            with open(csv_file, 'r', encoding='latin-1') as f:
-                header_lines = [f.readline() for _ in range(14)]
-            
-            output_file = period1_dir / csv_file.name
-            with open(output_file, 'w', encoding='utf-8', newline='') as f:
-                for line in header_lines:
-                    f.write(line)
-                valid_df.drop('timestamp', axis=1).to_csv(f, index=False, header=True, lineterminator='\n')
-            
-            stats['period1']['files'].append(csv_file.name)
-            stats['period1']['rows'] += len(valid_df)
-        else:
-            # Doesn't fit Period1 criteria
-            print(f"    ✗ Date range outside Period1 - moving to excluded")
-            shutil.copy(csv_file, excluded_dir / f"Period1_{csv_file.name}")
-            stats['excluded']['files'].append(f"Period1_{csv_file.name}")
-            stats['excluded']['rows'] += len(valid_df)
+        in_range = (timestamps >= start) & (timestamps <= end)
+        if in_range.any():
+            kept.append(chunk.loc[in_range].assign(timestamp=timestamps[in_range]))
     
-    except Exception as e:
-        print(f"    ERROR: {e}")
-        shutil.copy(csv_file, excluded_dir / f"Period1_{csv_file.name}")
-        stats['excluded']['files'].append(f"Period1_{csv_file.name}")
+    if chunk is None:
+        raise ValueError("No data rows")
+    df = pd.concat(kept) if kept else chunk.iloc[:0].assign(timestamp=pd.NaT)
+    return df, date_col, (valid_rows, first, last)
 
-# Process Period2 folder from data/updated
-source_dir = Path('data/updated/Period2')
-print(f"\nProcessing data/updated/Period2...")
-print(f"{'='*100}")
 
-for csv_file in sorted(source_dir.glob('*.csv')):
-    print(f"\n  {csv_file.name}:")
+def read_data_file(csv_file, keep_range=None):
+    """
+    Parse one logger CSV (header at row 14) and its timestamps into a 'timestamp' column.
+    Returns (df, date_col, header_lines, summary); df is None if the file cannot be read,
+    date_col is None if there is no date column.
+    With keep_range=(start, end) the file is streamed in chunks and df holds only the rows
+    in that range; summary is then (valid_rows, first, last) over the whole file, else None.
+    """
+    if keep_range is not None:
+        try:
+            with open(csv_file, 'rb') as f:
+                sample = f.read(4096)
+            encoding = sniff_encoding(sample)
+            lines = read_header_lines(csv_file, sample, encoding, 15)
+            try:
+                df, date_col, summary = read_rows_in_range(
+                    csv_file, encoding, stripped_names(lines[-1]), *keep_range, header_row=len(lines) - 1
+                )
+            except UnicodeDecodeError:
+                if encoding != 'utf-8':
+                    raise
+                # Non-utf-8 bytes after the sniffed sample; latin-1 accepts any byte
+                encoding = 'latin-1'
+                lines = read_header_lines(csv_file, sample, encoding, 15)
+                df, date_col, summary = read_rows_in_range(
+                    csv_file, encoding, stripped_names(lines[-1]), *keep_range, header_row=len(lines) - 1
+                )
+            return df, date_col, lines[:-1], summary
+        except Exception:
+            return None, None, None, None
     
     try:
-        # Read file
-        df = None
-        for encoding in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
-            try:
-                df = pd.read_csv(csv_file, header=14, encoding=encoding)
-                break
-            except:
-                continue
-        
-        if df is None:
-            raise ValueError("Could not read file")
-        
-        df.columns = df.columns.str.strip()
-        
-        # Find date column
-        date_col = next((c for c in df.columns if 'date' in c.lower() and 'time' in c.lower()), None)
-        
-        if not date_col:
-            print(f"    ERROR: No date column - moving to excluded")
-            shutil.copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
-            stats['excluded']['files'].append(f"Period2_{csv_file.name}")
-            continue
-        
-        # Parse dates
+        df, header_lines, _ = read_with_header_skip(csv_file)
+    except Exception:
+        return None, None, None, None
+    
+    # Find date column
+    date_col = next((c for c in df.columns if 'date' in c.lower() and 'time' in c.lower()), None)
+    
+    # Parse dates
+    if date_col:
         df['timestamp'] = pd.to_datetime(df[date_col], format='%m/%d/%Y %H:%M', errors='coerce')
-        valid_df = df.dropna(subset=['timestamp'])
-        
-        if len(valid_df) == 0:
-            print(f"    ERROR: No valid timestamps - moving to excluded")
-            shutil.copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
-            stats['excluded']['files'].append(f"Period2_{csv_file.name}")
-            continue
-        
-        orig_start = valid_df['timestamp'].min()
-        orig_end = valid_df['timestamp'].max()
-        print(f"    Date range: {orig_start} to {orig_end} ({len(valid_df)} rows)")
+    return df, date_col, header_lines, None
+
+
+def read_data_files(csv_files, keep_range=None):
+    """Parse files in parallel worker processes (results keep file order)."""
+    return parallel_map(read_data_file, csv_files, keep_range, chunksize=4)
+
+
+def main():
+    """Sort data/updated files into data_cleaned/Period1, Period2 and Excluded."""
+    print("="*100)
+    print("DATA REORGANIZATION - PROCESSING data/updated FOLDER")
+    print("="*100)
+    
+    # Create output directories
+    output_dir = Path('data_cleaned')
+    
+    # Clean up old directories if they exist
+    for old_dir in [output_dir / 'Period1', output_dir / 'Period2', output_dir / 'Excluded']:
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+    
+    period1_dir = output_dir / 'Period1'
+    period2_dir = output_dir / 'Period2'
+    excluded_dir = output_dir / 'Excluded'
+    
+    period1_dir.mkdir(parents=True, exist_ok=True)
+    period2_dir.mkdir(parents=True, exist_ok=True)
+    excluded_dir.mkdir(parents=True, exist_ok=True)
+    
+    print(f"\nCreated fresh output directories:")
+    print(f"  - {period1_dir}")
+    print(f"  - {period2_dir}")
+    print(f"  - {excluded_dir}")
+    
+    # Stats
+    stats = {
+        'period1': {'files': [], 'rows': 0},
+        'period2': {'files': [], 'rows': 0},
+        'excluded': {'files': [], 'rows': 0}
+    }
+    
+    # Process Period1 folder from data/updated
+    source_dir = Path('data/updated/Period1')
+    print(f"\nProcessing data/updated/Period1...")
+    print(f"{'='*100}")
+    
+    csv_files = sorted(source_dir.glob('*.csv'))
+    for csv_file, parsed in zip(csv_files, read_data_files(csv_files)):
+        print(f"\n  {csv_file.name}:")
         
-        # Check if this file has data from Dec 3 11:00 onwards
-        if orig_start >= PERIOD2_START:
-            # Filter to only keep data up to Dec 11 11:59:59
-            period2_data = valid_df[valid_df['timestamp'] <= PERIOD2_END]
+        try:
+            # Parsed in a worker process
+            df, date_col, header_lines, summary = parsed
             
-            if len(period2_data) > 0:
-                print(f"    ✓ Data from Dec 3 11:00 to Dec 11 11:59:59 - keeping {len(period2_data)} rows for Period2")
-                
-                with open(csv_file, 'r', encoding='latin-1') as f:
-                    header_lines = [f.readline() for _ in range(14)]
+            if df is None:
+                raise ValueError("Could not read file")
+            
+            if not date_col:
+                print(f"    ERROR: No date column - moving to excluded")
+                fast_copy(csv_file, excluded_dir / f"Period1_{csv_file.name}")
+                stats['excluded']['files'].append(f"Period1_{csv_file.name}")
+                continue
+            
+            # Output rows are picked with one mask each, without a dropna copy first
+            timestamps = df['timestamp']
+            valid_mask = timestamps.notna()
+            valid_rows = int(valid_mask.sum())
+            
+            if valid_rows == 0:
+                print(f"    ERROR: No valid timestamps - moving to excluded")
+                fast_copy(csv_file, excluded_dir / f"Period1_{csv_file.name}")
+                stats['excluded']['files'].append(f"Period1_{csv_file.name}")
+                continue
+            
+            orig_start = timestamps.min()
+            orig_end = timestamps.max()
+            print(f"    Date range: {orig_start} to {orig_end} ({valid_rows} rows)")
+            
+            # Check if this belongs in Period1 (Oct 23 - Nov 6)
+            if orig_start >= PERIOD1_START and orig_end <= PERIOD1_END:
+                # Perfect Period1 file
+                print(f"    ✓ Belongs in Period1")
                 
-                output_file = period2_dir / csv_file.name
-                with open(output_file, 'w', encoding='utf-8', newline='') as f:
-                    for line in header_lines:
-                        f.write(line)
-                    period2_data.drop('timestamp', axis=1).to_csv(f, index=False, header=True, lineterminator='\n')
+                # Copy file with filtered data
+                output_file = period1_dir / csv_file.name
+                out_df = df.loc[valid_mask, df.columns.drop('timestamp')]
+                write_logger_csv(output_file, header_lines, out_df)
                 
-                stats['period2']['files'].append(csv_file.name)
-                stats['period2']['rows'] += len(period2_data)
+                stats['period1']['files'].append(csv_file.name)
+                stats['period1']['rows'] += valid_rows
             else:
-                print(f"    ✗ No data within Period2 range - moving to excluded")
-                shutil.copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
+                # Doesn't fit Period1 criteria
+                print(f"    ✗ Date range outside Period1 - moving to excluded")
+                fast_copy(csv_file, excluded_dir / f"Period1_{csv_file.name}")
+                stats['excluded']['files'].append(f"Period1_{csv_file.name}")
+                stats['excluded']['rows'] += valid_rows
+        
+        except Exception as e:
+            print(f"    ERROR: {e}")
+            fast_copy(csv_file, excluded_dir / f"Period1_{csv_file.name}")
+            stats['excluded']['files'].append(f"Period1_{csv_file.name}")
+    
+    # Process Period2 folder from data/updated
+    source_dir = Path('data/updated/Period2')
+    print(f"\nProcessing data/updated/Period2...")
+    print(f"{'='*100}")
+    
+    csv_files = sorted(source_dir.glob('*.csv'))
+    # Only rows within Period2 are kept while streaming; the summary covers the whole file
+    parsed_files = read_data_files(csv_files, keep_range=(PERIOD2_START, PERIOD2_END))
+    for csv_file, parsed in zip(csv_files, parsed_files):
+        print(f"\n  {csv_file.name}:")
+        
+        try:
+            # Parsed in a worker process
+            df, date_col, header_lines, summary = parsed
+            
+            if df is None:
+                raise ValueError("Could not read file")
+            
+            if not date_col:
+                print(f"    ERROR: No date column - moving to excluded")
+                fast_copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
                 stats['excluded']['files'].append(f"Period2_{csv_file.name}")
-                stats['excluded']['rows'] += len(valid_df)
+                continue
             
-        elif orig_end >= PERIOD2_START:
-            # File spans multiple periods - filter to keep only Dec 3 11:00 to Dec 11 11:59:59
-            period2_data = valid_df[(valid_df['timestamp'] >= PERIOD2_START) & 
-                                   (valid_df['timestamp'] <= PERIOD2_END)]
+            valid_rows, orig_start, orig_end = summary
             
-            if len(period2_data) > 0:
-                print(f"    ✓ Filtered to Dec 3 11:00 - Dec 11 11:59:59 - keeping {len(period2_data)} rows for Period2")
-                
-                with open(csv_file, 'r', encoding='latin-1') as f:
-                    header_lines = [f.readline() for _ in range(14)]
+            if valid_rows == 0:
+                print(f"    ERROR: No valid timestamps - moving to excluded")
+                fast_copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
+                stats['excluded']['files'].append(f"Period2_{csv_file.name}")
+                continue
+            
+            print(f"    Date range: {orig_start} to {orig_end} ({valid_rows} rows)")
+            
+            # Check if this file has data from Dec 3 11:00 onwards
+            if orig_start >= PERIOD2_START:
+                # Only rows up to Dec 11 11:59:59 were kept while streaming
+                period2_rows = len(df)
                 
-                output_file = period2_dir / csv_file.name
-                with open(output_file, 'w', encoding='utf-8', newline='') as f:
-                    for line in header_lines:
-                        f.write(line)
-                    period2_data.drop('timestamp', axis=1).to_csv(f, index=False, header=True, lineterminator='\n')
+                if period2_rows > 0:
+                    print(f"    ✓ Data from Dec 3 11:00 to Dec 11 11:59:59 - keeping {period2_rows} rows for Period2")
+                    
+                    output_file = period2_dir / csv_file.name
+                    out_df = df.drop(columns='timestamp')
+                    write_logger_csv(output_file, header_lines, out_df)
+                    
+                    stats['period2']['files'].append(csv_file.name)
+                    stats['period2']['rows'] += period2_rows
+                else:
+                    print(f"    ✗ No data within Period2 range - moving to excluded")
+                    fast_copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
+                    stats['excluded']['files'].append(f"Period2_{csv_file.name}")
+                    stats['excluded']['rows'] += valid_rows
+            
+            elif orig_end >= PERIOD2_START:
+                # File spans multiple periods - kept only Dec 3 11:00 to Dec 11 11:59:59
+                period2_rows = len(df)
                 
-                stats['period2']['files'].append(csv_file.name)
-                stats['period2']['rows'] += len(period2_data)
+                if period2_rows > 0:
+                    print(f"    ✓ Filtered to Dec 3 11:00 - Dec 11 11:59:59 - keeping {period2_rows} rows for Period2")
+                    
+                    output_file = period2_dir / csv_file.name
+                    out_df = df.drop(columns='timestamp')
+                    write_logger_csv(output_file, header_lines, out_df)
+                    
+                    stats['period2']['files'].append(csv_file.name)
+                    stats['period2']['rows'] += period2_rows
+                else:
+                    print(f"    ✗ No data from Dec 3 11:00+ - moving to excluded")
+                    fast_copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
+                    stats['excluded']['files'].append(f"Period2_{csv_file.name}")
+                    stats['excluded']['rows'] += valid_rows
+            
+            elif orig_start >= PERIOD1_START and orig_end <= PERIOD1_END:
+                # This is actually Period1 data (Oct 23 - Nov 6)
+                print(f"    ✗ This is Period1 data (Oct 23 - Nov 6) - moving to excluded")
+                fast_copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
+                stats['excluded']['files'].append(f"Period2_{csv_file.name}")
+                stats['excluded']['rows'] += valid_rows
+            
             else:
-                print(f"    ✗ No data from Dec 3 11:00+ - moving to excluded")
-                shutil.copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
+                # Doesn't fit any criteria
+                print(f"    ✗ Date range doesn't fit Period2 criteria - moving to excluded")
+                fast_copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
                 stats['excluded']['files'].append(f"Period2_{csv_file.name}")
-                stats['excluded']['rows'] += len(valid_df)
+                stats['excluded']['rows'] += valid_rows
         
-        elif orig_start >= PERIOD1_START and orig_end <= PERIOD1_END:
-            # This is actually Period1 data (Oct 23 - Nov 6)
-            print(f"    ✗ This is Period1 data (Oct 23 - Nov 6) - moving to excluded")
-            shutil.copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
+        except Exception as e:
+            print(f"    ERROR: {e}")
+            fast_copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
             stats['excluded']['files'].append(f"Period2_{csv_file.name}")
-            stats['excluded']['rows'] += len(valid_df)
-        
-        else:
-            # Doesn't fit any criteria
-            print(f"    ✗ Date range doesn't fit Period2 criteria - moving to excluded")
-            shutil.copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
-            stats['excluded']['files'].append(f"Period2_{csv_file.name}")
-            stats['excluded']['rows'] += len(valid_df)
     
-    except Exception as e:
-        print(f"    ERROR: {e}")
-        shutil.copy(csv_file, excluded_dir / f"Period2_{csv_file.name}")
-        stats['excluded']['files'].append(f"Period2_{csv_file.name}")
-
-# Summary
-print(f"\n\n{'='*100}")
-print("REORGANIZATION SUMMARY")
-print(f"{'='*100}")
-
-print(f"\nPeriod1 ({PERIOD1_START.date()} to {PERIOD1_END.date()}):")
-print(f"  Files: {len(stats['period1']['files'])}")
-print(f"  Total rows: {stats['period1']['rows']:,}")
-if stats['period1']['files']:
-    for f in stats['period1']['files']:
-        print(f"    - {f}")
-
-print(f"\nPeriod2 (from {PERIOD2_START}):")
-print(f"  Files: {len(stats['period2']['files'])}")
-print(f"  Total rows: {stats['period2']['rows']:,}")
-if stats['period2']['files']:
-    for f in stats['period2']['files']:
-        print(f"    - {f}")
+    # Summary
+    print(f"\n\n{'='*100}")
+    print("REORGANIZATION SUMMARY")
+    print(f"{'='*100}")
+    
+    print(f"\nPeriod1 ({PERIOD1_START.date()} to {PERIOD1_END.date()}):")
+    print(f"  Files: {len(stats['period1']['files'])}")
+    print(f"  Total rows: {stats['period1']['rows']:,}")
+    if stats['period1']['files']:
+        for f in stats['period1']['files']:
+            print(f"    - {f}")
+    
+    print(f"\nPeriod2 (from {PERIOD2_START}):")
+    print(f"  Files: {len(stats['period2']['files'])}")
+    print(f"  Total rows: {stats['period2']['rows']:,}")
+    if stats['period2']['files']:
+        for f in stats['period2']['files']:
+            print(f"    - {f}")
+    
+    print(f"\nExcluded:")
+    print(f"  Files: {len(stats['excluded']['files'])}")
+    print(f"  Total rows: {stats['excluded']['rows']:,}")
+    if stats['excluded']['files']:
+        for f in stats['excluded']['files']:
+            print(f"    - {f}")
+    
+    print(f"\n{'='*100}")
+    print("✓ Data reorganized successfully!")
+    print(f"{'='*100}")
 
-print(f"\nExcluded:")
-print(f"  Files: {len(stats['excluded']['files'])}")
-print(f"  Total rows: {stats['excluded']['rows']:,}")
-if stats['excluded']['files']:
-    for f in stats['excluded']['files']:
-        print(f"    - {f}")
 
-print(f"\n{'='*100}")
-print("✓ Data reorganized successfully!")
-print(f"{'='*100}")
+if __name__ == '__main__':
+    main()
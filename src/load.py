@@ -5,11 +5,19 @@ Handles CSV parsing, missing sensors, and irregular timestamps.
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 from pathlib import Path
+from collections import defaultdict
+import io
 import re
 import logging
 import sys
 
+from src.logger_csv import read_header_lines, read_logger_table, sniff_encoding, stripped_names
+from src.parallel import parallel_map
+
 # Configure console logging only
 logging.basicConfig(
     level=logging.INFO,
@@ -28,14 +36,29 @@ WALL_TOPOLOGY = {
 }
 
 
+# Sensor ID -> (wall_id, 'out'/'in'), precomputed from WALL_TOPOLOGY
+SENSOR_INDEX = {
+    sensor_id: (wall_id, position)
+    for wall_id, (out_sensors, in_sensors) in WALL_TOPOLOGY.items()
+    for position, sensors in (('out', out_sensors), ('in', in_sensors))
+    for sensor_id in sensors
+}
+
+
 def get_sensor_wall(sensor_id):
     """Return (wall_id, 'out'/'in') for a sensor ID."""
-    for wall_id, (out_sensors, in_sensors) in WALL_TOPOLOGY.items():
-        if sensor_id in out_sensors:
-            return wall_id, 'out'
-        if sensor_id in in_sensors:
-            return wall_id, 'in'
-    return None, None
+    return SENSOR_INDEX.get(sensor_id, (None, None))
+
+
+# Stacked periods from load_period_data are cached here (project-level, outside
+# the data folders). Bump LOADER_VERSION whenever the parsing or the output
+# schema changes so stale caches are rebuilt.
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'periods'
+LOADER_VERSION = 2
+
+
+# Box and sensor from names like GW_1.1_111025.csv (Period1) or GW1.1_121125.csv (Period2)
+_FN_RE = re.compile(r'GW_?(\d+)\.(\d+)_')
 
 
 def parse_filename(filename):
@@ -44,25 +67,112 @@ def parse_filename(filename):
     Example: GW_1.1_111025.csv -> box_id=1, sensor_id=1
              GW_2.5_111025.csv -> box_id=2, sensor_id=5
     """
-    pattern = r'GW_?(\d+)\.(\d+)_'
-    match = re.search(pattern, filename)
-    if match:
-        box_id = int(match.group(1))
-        sensor_id = int(match.group(2))
-        return box_id, sensor_id
-    
-    # Try alternative pattern (Period2 format)
-    pattern2 = r'GW(\d+)\.(\d+)_'
-    match = re.search(pattern2, filename)
+    match = _FN_RE.search(filename)
     if match:
-        box_id = int(match.group(1))
-        sensor_id = int(match.group(2))
-        return box_id, sensor_id
+        return int(match.group(1)), int(match.group(2))
     
     logger.warning(f"Could not parse filename: {filename}")
     return None, None
 
 
+# Logger Date/Time layout M/D/YYYY H:MM, one named group per field
+_TIMESTAMP_RE = r'^(?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<year>\d{4}) (?P<hour>\d{1,2}):(?P<minute>\d{2})$'
+
+# Parsed Date/Time strings, shared by the files loaded in this process. load_all_periods
+# loads files in parallel_map workers, so each worker keeps its own copy: it only
+# helps for later files handled by the same worker, and starts empty in every new pool.
+_TIMESTAMP_CACHE = {}
+
+
+def parse_mdy_hm(strings):
+    """
+    Vectorized parse of M/D/YYYY H:MM strings to a datetime64[us] array.
+    Fields are split by Arrow's C++ regex engine and combined with numpy date
+    arithmetic, so there is no per-string strptime; strings that do not match or
+    name an impossible date/time (month 13, Feb 30, 24:00) become NaT, as with pd.to_datetime.
+    """
+    parts = pc.extract_regex(pa.array([str(s) for s in strings], type=pa.string()), _TIMESTAMP_RE)
+    month, day, year, hour, minute = (
+        pc.cast(pc.struct_field(parts, name), pa.int64()).fill_null(1).to_numpy()
+        for name in ('month', 'day', 'year', 'hour', 'minute')
+    )
+    
+    month_index = (year - 1970) * 12 + (month - 1)
+    month_start = month_index.astype('datetime64[M]').astype('datetime64[D]')
+    month_days = ((month_index + 1).astype('datetime64[M]').astype('datetime64[D]') - month_start).astype(np.int64)
+    valid = (
+        parts.is_valid().to_numpy(zero_copy_only=False)
+        & (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+        & (hour < 24) & (minute < 60)
+    )
+    
+    timestamps = (
+        month_start.astype('datetime64[us]') + (day - 1).astype('timedelta64[D]')
+        + hour.astype('timedelta64[h]') + minute.astype('timedelta64[m]')
+    )
+    timestamps[~valid] = np.datetime64('NaT')
+    return timestamps
+
+
+def parse_timestamps(values):
+    """
+    Parse M/D/YYYY H:MM strings (e.g. "10/23/2025 12:01"); unparseable values become NaT.
+    Each distinct string is parsed once (parse_mdy_hm) and kept in _TIMESTAMP_CACHE, so the same
+    timestamps in later files (other sensors of the same logger run) are looked up. The cache
+    is per process: under load_all_periods' worker pool a file only reuses strings parsed by
+    earlier files in the same worker, so with several workers most files parse their own.
+    A categorical column (as read by load_csv_file) is used as already factorized.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    if len(uniques) == 0:
+        return pd.to_datetime(values, format='%m/%d/%Y %H:%M', errors='coerce')
+    
+    uniques = uniques.tolist()
+    new = [u for u in uniques if u not in _TIMESTAMP_CACHE]
+    if new:
+        _TIMESTAMP_CACHE.update(zip(new, parse_mdy_hm(new)))
+    
+    # Code -1 (missing value) picks the trailing NaT
+    lookup = np.array([_TIMESTAMP_CACHE[u] for u in uniques] + [np.datetime64('NaT')])
+    return pd.Series(lookup[codes], index=values.index)
+
+
+# Column roles of each header layout seen in this process, keyed by the cleaned names
+_COL_CACHE = {}
+
+
+def detect_columns(columns):
+    """
+    Match cleaned column names to their roles (flexible matching).
+    Returns a dict with keys 'date', 'surface', 'internal', 'room' and 'wall_type'
+    (None when not found); files sharing a header layout reuse one result.
+    """
+    key = tuple(columns)
+    roles = _COL_CACHE.get(key)
+    if roles is not None:
+        return roles
+    
+    roles = dict.fromkeys(['date', 'surface', 'internal', 'room', 'wall_type'])
+    for col in columns:
+        if 'date' in col and 'time' in col:
+            roles['date'] = col
+        elif 'value' in col and 'heat' in col and 'surface' in col:
+            # 'Value Heat Surface Sensor' or similar
+            roles['surface'] = col
+        elif 'internal' in col and 'temp' in col:
+            roles['internal'] = col
+        elif 'out' in col and 'air' in col and 'temp' in col:
+            roles['room'] = col
+        elif 'wall' in col and 'type' in col:
+            roles['wall_type'] = col
+    
+    _COL_CACHE[key] = roles
+    return roles
+
+
 def load_csv_file(filepath):
     """
     Load a single CSV file with proper header handling.
@@ -70,67 +180,81 @@ def load_csv_file(filepath):
     - Data ends when 2+ required columns are missing
     - Expected date format: M/D/YYYY H:MM (e.g., "10/23/2025 12:01")
     """
-    logger.info(f"\n{'='*70}")
-    logger.info(f"📄 FILE: {filepath.name}")
-    logger.info(f"   Path: {filepath}")
-    logger.info(f"{'='*70}")
+    logger.info("\n%s", '='*70)
+    logger.info("📄 FILE: %s", filepath.name)
+    logger.info("   Path: %s", filepath)
+    logger.info("%s", '='*70)
     
     try:
-        # Try multiple encodings
-        df = None
-        for encoding in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
-            try:
-                df = pd.read_csv(filepath, header=14, encoding=encoding)
-                logger.info(f"✓ Loaded with encoding: {encoding}")
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if df is None:
-            logger.error(f"❌ Could not read file with any encoding")
-            return None
-        logger.info(f"✓ Raw rows read: {len(df)}")
+        # Read the bytes once; the header line is probed first so that only the
+        # needed columns are parsed, in the detected encoding
+        raw = filepath.read_bytes()
+        encoding = sniff_encoding(raw)
+        header = read_header_lines(filepath, raw[:4096], encoding, 15)
+        names = stripped_names(header[-1])
         
         # Clean column names
-        df.columns = df.columns.str.strip().str.lower()
-        logger.info(f"✓ Columns found: {list(df.columns[:5])}...")  # Show first 5
-        
-        # Expected columns (flexible matching)
-        date_col = None
-        surface_col = None
-        internal_col = None
-        room_col = None
-        wall_type_col = None
+        columns = [c.lower() for c in names]
+        raw_names = dict(zip(columns, names))
         
-        for col in df.columns:
-            if 'date' in col and 'time' in col:
-                date_col = col
-            elif 'value' in col and 'heat' in col and 'surface' in col:
-                # 'Value Heat Surface Sensor' or similar
-                surface_col = col
-            elif 'internal' in col and 'temp' in col:
-                internal_col = col
-            elif 'out' in col and 'air' in col and 'temp' in col:
-                room_col = col
-            elif 'wall' in col and 'type' in col:
-                wall_type_col = col
+        # Expected columns (flexible matching), resolved once per header layout
+        roles = detect_columns(columns)
+        date_col = roles['date']
+        surface_col = roles['surface']
+        internal_col = roles['internal']
+        room_col = roles['room']
+        wall_type_col = roles['wall_type']
         
         if not date_col:
-            logger.error(f"❌ No date/time column found in {filepath}")
+            logger.info("✓ Loaded with encoding: %s", encoding)
+            logger.info("✓ Columns found: %s...", columns[:5])  # Show first 5
+            logger.error("❌ No date/time column found in %s", filepath)
+            return None
+        
+        # The layout is fixed, so the reader is told each column's type: temperatures
+        # are parsed straight to float32, and dates are dictionary-encoded while
+        # parsing (each distinct string stored once, rows as integer codes)
+        used_cols = [c for c in (date_col, surface_col, internal_col, room_col, wall_type_col) if c]
+        temp_cols = [c for c in (surface_col, internal_col, room_col) if c]
+        column_types = {raw_names[c]: pa.float32() for c in temp_cols}
+        column_types[raw_names[date_col]] = pa.dictionary(pa.int32(), pa.string())
+        include_columns = [raw_names[c] for c in used_cols]
+        try:
+            try:
+                table = read_logger_table(
+                    io.BytesIO(raw), encoding, len(header) - 1, names, include_columns=include_columns, column_types=column_types
+                )
+                coerce_cols = []
+            except pa.ArrowInvalid:
+                # A non-numeric temperature value: parse untyped and coerce those columns below
+                date_type = {raw_names[date_col]: column_types[raw_names[date_col]]}
+                table = read_logger_table(
+                    io.BytesIO(raw), encoding, len(header) - 1, names, include_columns=include_columns, column_types=date_type
+                )
+                coerce_cols = temp_cols
+        except pa.ArrowInvalid as e:
+            logger.error("❌ Could not parse file as %s: %s", encoding, e)
             return None
+        logger.info("✓ Loaded with encoding: %s", encoding)
+        logger.info("✓ Raw rows read: %d", table.num_rows)
+        logger.info("✓ Columns found: %s...", columns[:5])  # Show first 5
         
-        logger.info(f"✓ Found columns:")
-        logger.info(f"  Date: '{date_col}'")
+        logger.info("✓ Found columns:")
+        logger.info("  Date: '%s'", date_col)
         if surface_col:
-            logger.info(f"  Surface: '{surface_col}'")
+            logger.info("  Surface: '%s'", surface_col)
         if internal_col:
-            logger.info(f"  Internal: '{internal_col}'")
+            logger.info("  Internal: '%s'", internal_col)
         if room_col:
-            logger.info(f"  Room: '{room_col}'")
+            logger.info("  Room: '%s'", room_col)
+        
+        df = table.rename_columns([c.lower() for c in table.column_names]).to_pandas()
+        for col in coerce_cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
         
         # Parse Date/Time with explicit format for "10/23/2025 12:01"
-        logger.info(f"  Parsing timestamps (format: M/D/YYYY H:MM)...")
-        df['timestamp'] = pd.to_datetime(df[date_col], format='%m/%d/%Y %H:%M', errors='coerce')
+        logger.info("  Parsing timestamps (format: M/D/YYYY H:MM)...")
+        df['timestamp'] = parse_timestamps(df[date_col])
         
         # Check for data completeness (end of file when 2+ required columns missing)
         required_cols = [date_col]
@@ -141,105 +265,167 @@ def load_csv_file(filepath):
         if room_col:
             required_cols.append(room_col)
         
-        logger.info(f"  Checking data completeness (required columns: {len(required_cols)})...")
-        df['_missing_count'] = df[required_cols].isna().sum(axis=1)
+        logger.info("  Checking data completeness (required columns: %d)...", len(required_cols))
+        # Per-row count of missing required values, summed in uint8 (at most 4 columns)
+        missing = np.zeros(len(df), dtype=np.uint8)
+        for col in required_cols:
+            missing += df[col].isna().to_numpy().view(np.uint8)
+        invalid = missing >= 2
         
         # Find first row where 2+ required values are missing
-        invalid_rows = df[df['_missing_count'] >= 2]
-        if len(invalid_rows) > 0:
-            first_invalid = invalid_rows.index[0]
+        if invalid.any():
+            first_invalid = int(invalid.argmax())
             if first_invalid > 0:
                 dropped_rows = len(df) - first_invalid
-                logger.warning(f"⚠ Found row with 2+ missing values at index {first_invalid}")
-                logger.warning(f"  Dropping {dropped_rows} rows from that point (end of data)")
+                logger.warning("⚠ Found row with 2+ missing values at index %d", first_invalid)
+                logger.warning("  Dropping %d rows from that point (end of data)", dropped_rows)
                 df = df.iloc[:first_invalid]
         
-        # Drop the helper column
-        df = df.drop(columns=['_missing_count'], errors='ignore')
-        
-        # Drop any remaining rows with invalid timestamp
-        df = df.dropna(subset=['timestamp'])
+        # Drop any remaining rows with invalid timestamp (NaT checked on the datetime64 buffer)
+        valid_timestamp = ~np.isnat(df['timestamp'].to_numpy())
+        if not valid_timestamp.all():
+            df = df.iloc[valid_timestamp]
         
         # Log sample raw vs parsed
-        if len(df) > 0 and not df['timestamp'].isna().all():
+        if logger.isEnabledFor(logging.INFO) and len(df) > 0 and not df['timestamp'].isna().all():
             first_valid_idx = df['timestamp'].first_valid_index()
-            logger.info(f"  Sample: '{df[date_col].iloc[first_valid_idx]}' → {df['timestamp'].iloc[first_valid_idx]}")
+            logger.info("  Sample: '%s' → %s", df[date_col].iloc[first_valid_idx], df['timestamp'].iloc[first_valid_idx])
         
         if len(df) == 0:
-            logger.warning(f"❌ No valid data in {filepath}")
+            logger.warning("❌ No valid data in %s", filepath)
             return None
         
-        logger.info(f"✓ Valid timestamp rows: {len(df)}")
-        logger.info(f"  Time range: {df['timestamp'].min()} → {df['timestamp'].max()}")
+        logger.info("✓ Valid timestamp rows: %d", len(df))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("  Time range: %s → %s", df['timestamp'].min(), df['timestamp'].max())
         
-        # Rename columns to standard names
-        rename_map = {}
-        if surface_col:
-            rename_map[surface_col] = 'surface_temp'
-        if internal_col:
-            rename_map[internal_col] = 'internal_temp'
-        if room_col:
-            rename_map[room_col] = 'room_temp'
+        # Build the output frame once, under the standard column names
+        out = {'timestamp': df['timestamp'].to_numpy()}
+        for col, name in ((surface_col, 'surface_temp'), (internal_col, 'internal_temp'), (room_col, 'room_temp')):
+            if col:
+                out[name] = df[col].to_numpy()
         if wall_type_col:
-            rename_map[wall_type_col] = 'wall_type'
-        
-        df = df.rename(columns=rename_map)
-        
-        # Strip trailing/leading spaces from wall_type values
-        if 'wall_type' in df.columns:
-            df['wall_type'] = df['wall_type'].astype(str).str.strip()
-            # Fix typo: 'Yraka' should be 'Yarka'
-            df['wall_type'] = df['wall_type'].replace('Yraka', 'Yarka')
-        
-        # Keep only needed columns
-        keep_cols = ['timestamp', 'surface_temp', 'internal_temp', 'room_temp', 'wall_type']
-        keep_cols = [c for c in keep_cols if c in df.columns]
-        df = df[keep_cols]
-        
-        # Convert numeric columns
-        for col in ['surface_temp', 'internal_temp', 'room_temp']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+            # Strip trailing/leading spaces and fix typo: 'Yraka' should be 'Yarka'
+            wall_types = df[wall_type_col].astype(str).str.strip().replace('Yraka', 'Yarka')
+            out['wall_type'] = pd.Categorical(wall_types)
+        df = pd.DataFrame(out, index=df.index, copy=False)
         
         # Check for missing values
-        logger.info(f"\n  Missing value check:")
+        logger.info("\n  Missing value check:")
         for col in ['surface_temp', 'internal_temp', 'room_temp', 'wall_type']:
             if col in df.columns:
                 missing_count = df[col].isna().sum()
                 if missing_count > 0:
                     pct = (missing_count / len(df)) * 100
-                    logger.warning(f"    ⚠ {col}: {missing_count} missing ({pct:.1f}%)")
+                    logger.warning("    ⚠ %s: %d missing (%.1f%%)", col, missing_count, pct)
                 else:
-                    logger.info(f"    ✓ {col}: no missing values")
+                    logger.info("    ✓ %s: no missing values", col)
         
-        # Show sample data
-        if len(df) > 0:
-            logger.info(f"\n  Sample data from {filepath.name} (first valid row):")
+        # Show sample data (skipped, lookups included, when INFO is not logged)
+        if logger.isEnabledFor(logging.INFO) and len(df) > 0:
+            logger.info("\n  Sample data from %s (first valid row):", filepath.name)
             first_idx = df.index[0]
-            logger.info(f"    timestamp:     {df.loc[first_idx, 'timestamp']}")
+            logger.info("    timestamp:     %s", df.loc[first_idx, 'timestamp'])
             if 'surface_temp' in df.columns:
-                logger.info(f"    surface_temp:  {df.loc[first_idx, 'surface_temp']:.2f}°C")
+                logger.info("    surface_temp:  %.2f°C", df.loc[first_idx, 'surface_temp'])
             if 'internal_temp' in df.columns:
-                logger.info(f"    internal_temp: {df.loc[first_idx, 'internal_temp']:.2f}°C")
+                logger.info("    internal_temp: %.2f°C", df.loc[first_idx, 'internal_temp'])
             if 'room_temp' in df.columns:
-                logger.info(f"    room_temp:     {df.loc[first_idx, 'room_temp']:.2f}°C")
+                logger.info("    room_temp:     %.2f°C", df.loc[first_idx, 'room_temp'])
             if 'wall_type' in df.columns:
-                logger.info(f"    wall_type:     '{df.loc[first_idx, 'wall_type']}'")
-                
-                # Show wall type distribution
-                wall_types = df['wall_type'].value_counts()
-                logger.info(f"\n  Wall types in this file:")
-                for wt, count in wall_types.items():
-                    pct = (count / len(df)) * 100
-                    logger.info(f"    '{wt}': {count} rows ({pct:.1f}%)")
+                logger.info("    wall_type:     '%s'", df.loc[first_idx, 'wall_type'])
         
         return df
     
     except Exception as e:
-        logger.error(f"Error loading {filepath}: {e}")
+        logger.error("Error loading %s: %s", filepath, e)
         return None
 
 
+class _RecordCollector(logging.Handler):
+    """Keeps emitted log records in a list instead of writing them."""
+    
+    def __init__(self):
+        super().__init__()
+        self.records = []
+    
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _load_csv_file_logged(filepath):
+    """
+    Run load_csv_file in a worker process with its log records captured.
+    Returns (df, records) so the parent can replay the records in file order.
+    """
+    collector = _RecordCollector()
+    logger.addHandler(collector)
+    logger.propagate = False
+    try:
+        df = load_csv_file(filepath)
+    finally:
+        logger.removeHandler(collector)
+        logger.propagate = True
+    return df, collector.records
+
+
+def load_csv_files(csv_files):
+    """
+    Load files in parallel worker processes (results keep file order).
+    Returns a list of (df, log_records) per file.
+    """
+    return parallel_map(_load_csv_file_logged, csv_files)
+
+
+def stack_frames(frames):
+    """
+    Stack per-file DataFrames into one with a fresh RangeIndex, like
+    pd.concat(frames, ignore_index=True), but filling one preallocated array per
+    column so the data is copied once. Each column gets the common dtype of all
+    frames (upcast as pd.concat does, also when a frame lacks it); wall_type becomes
+    a single categorical.
+    """
+    columns = list(dict.fromkeys(col for df in frames for col in df.columns))
+    offsets = np.cumsum([0] + [len(df) for df in frames])
+    data = {}
+    for col in columns:
+        if col == 'wall_type':
+            data[col] = pd.api.types.union_categoricals(
+                [df[col].astype('category') if col in df.columns else pd.Categorical([np.nan] * len(df)) for df in frames],
+                sort_categories=True,
+            )
+            continue
+        
+        # Common dtype over all frames, upcast like pd.concat when a frame lacks the column
+        present = [col in df.columns for df in frames]
+        dtypes = [df[col].dtype for df in frames if col in df.columns]
+        dtype = None
+        if all(isinstance(d, np.dtype) for d in dtypes):
+            try:
+                dtype = np.result_type(*dtypes)
+            except TypeError:
+                dtype = np.dtype(object)  # e.g. numbers and datetimes
+            if not all(present):
+                if dtype.kind in 'iu':
+                    dtype = np.dtype('float64')
+                elif dtype.kind == 'b':
+                    dtype = np.dtype(object)
+        if dtype is None:
+            # Extension dtypes (e.g. strings): pandas resolves the stacked type, with
+            # frames lacking the column contributing missing values as in pd.concat
+            data[col] = pd.concat(
+                [df.loc[:, df.columns.intersection([col])] for df in frames], ignore_index=True
+            )[col]
+            continue
+        
+        missing = dtype.type('NaT') if dtype.kind in 'mM' else np.nan
+        out = np.empty(offsets[-1], dtype=dtype)
+        for df, has_col, start, stop in zip(frames, present, offsets[:-1], offsets[1:]):
+            out[start:stop] = df[col].to_numpy() if has_col else missing
+        data[col] = out
+    return pd.DataFrame(data)
+
+
 def load_period_data(period_folder):
     """
     Load all CSV files from a period folder.
@@ -261,14 +447,31 @@ def load_period_data(period_folder):
     logger.info(f"\n📊 Found {len(csv_files)} CSV files")
     logger.info(f"   Files: {[f.name for f in csv_files[:5]]}{'...' if len(csv_files) > 5 else ''}")
     
+    # Reuse the stacked period from the last load while the CSV files are unchanged
+    cache_file = CACHE_DIR / f'{folder_path.name}.parquet'
+    stamp_file = CACHE_DIR / f'{folder_path.name}.stamp'
+    stamp = '\n'.join(
+        [f"loader {LOADER_VERSION} {folder_path.resolve()}"]
+        + [f"{f.name} {f.stat().st_size} {f.stat().st_mtime_ns}" for f in csv_files]
+    )
+    if cache_file.exists() and stamp_file.exists() and stamp_file.read_text() == stamp:
+        combined = pd.read_parquet(cache_file, engine='pyarrow')
+        logger.info(f"\n✓ Loaded {len(combined):,} rows from cache: {cache_file}")
+        logger.info(f"{'='*80}\n")
+        return combined
+    
     all_data = []
     success_count = 0
     fail_count = 0
     total_rows = 0
     
-    for csv_file in csv_files:
-        box_id, sensor_id = parse_filename(csv_file.name)
-        
+    # Parse files with a known box/sensor in worker processes; each file's log
+    # records are replayed below, in file order
+    file_ids = [parse_filename(csv_file.name) for csv_file in csv_files]
+    to_load = [f for f, (box_id, sensor_id) in zip(csv_files, file_ids) if box_id is not None and sensor_id is not None]
+    loaded = dict(zip(to_load, load_csv_files(to_load)))
+    
+    for csv_file, (box_id, sensor_id) in zip(csv_files, file_ids):
         if box_id is None or sensor_id is None:
             logger.error(f"❌ Skipping {csv_file.name} - could not parse filename")
             fail_count += 1
@@ -277,7 +480,9 @@ def load_period_data(period_folder):
         wall_id, position = get_sensor_wall(sensor_id)
         logger.info(f"\n→ Box{box_id} / Sensor{sensor_id} / Wall{wall_id} / Position:{position}")
         
-        df = load_csv_file(csv_file)
+        df, records = loaded[csv_file]
+        for record in records:
+            logger.handle(record)
         
         if df is None or len(df) == 0:
             logger.warning(f"  ❌ Skipping - no valid data")
@@ -307,27 +512,46 @@ def load_period_data(period_folder):
         logger.error(f"❌ No data loaded from {period_folder}")
         return None
     
-    combined = pd.concat(all_data, ignore_index=True)
+    combined = stack_frames(all_data)
     
     # Detailed file-to-sensor mapping
     logger.info(f"\n  File-to-Sensor Mapping:")
     logger.info(f"  {'File':<25} {'Box':<5} {'Sensor':<8} {'Wall':<6} {'Pos':<5} {'Rows':<8} {'Wall Types':<30}")
     logger.info(f"  {'-'*100}")
-    for csv_file in csv_files:
-        box_id, sensor_id = parse_filename(csv_file.name)
+    # One grouped aggregation per (box, sensor) drives the mapping and the
+    # breakdowns below; no per-sensor frames are materialized
+    sensor_groups = combined.groupby(['box_id', 'sensor_id'], sort=False)
+    sensor_table = sensor_groups[['wall_id', 'position']].first()
+    sensor_table['rows'] = sensor_groups.size()
+    if 'wall_type' in combined.columns:
+        sensor_table['wall_types'] = sensor_groups['wall_type'].unique()
+    sensor_table = sensor_table.reset_index()
+    sensor_rows = {(row.box_id, row.sensor_id): row for row in sensor_table.itertuples(index=False)}
+    for csv_file, (box_id, sensor_id) in zip(csv_files, file_ids):
         if box_id and sensor_id:
             wall_id, position = get_sensor_wall(sensor_id)
-            file_data = combined[(combined['box_id'] == box_id) & (combined['sensor_id'] == sensor_id)]
-            if len(file_data) > 0:
-                rows = len(file_data)
-                wall_types = file_data['wall_type'].dropna().unique() if 'wall_type' in file_data.columns else []
+            file_data = sensor_rows.get((box_id, sensor_id))
+            if file_data is not None:
+                rows = file_data.rows
+                wall_types = [wt for wt in file_data.wall_types if pd.notna(wt)] if 'wall_types' in sensor_table.columns else []
                 wall_types_str = ', '.join([str(wt) for wt in wall_types]) if len(wall_types) > 0 else 'N/A'
                 if len(wall_types_str) > 28:
                     wall_types_str = wall_types_str[:25] + '...'
                 logger.info(f"  {csv_file.name:<25} {box_id:<5} {sensor_id:<8} {wall_id or 'N/A':<6} {position or 'N/A':<5} {rows:<8,} {wall_types_str:<30}")
     
+    # Wall type distribution of every sensor, counted in one grouped pass
+    if 'wall_type' in combined.columns:
+        wall_type_counts = combined.groupby(['box_id', 'sensor_id', 'wall_type'], observed=True).size()
+        sensor_totals = wall_type_counts.groupby(level=['box_id', 'sensor_id']).transform('sum')
+        logger.info(f"\n  Wall types per sensor:")
+        logger.info(f"  {'Box':<5} {'Sensor':<8} {'Wall Type':<20} {'Rows':<8} {'Share':<6}")
+        logger.info(f"  {'-'*50}")
+        for ((box_id, sensor_id, wall_type), count), total in zip(wall_type_counts.items(), sensor_totals):
+            pct = count / total * 100
+            logger.info(f"  {box_id:<5} {sensor_id:<8} {wall_type:<20} {count:<8,} {pct:5.1f}%")
+    
     # Sensor availability summary
-    sensors_found = sorted(combined['sensor_id'].unique())
+    sensors_found = sorted(sensor_table['sensor_id'].unique())
     sensors_missing = [s for s in range(1, 17) if s not in sensors_found]
     
     logger.info(f"\n  Sensor availability:")
@@ -337,8 +561,8 @@ def load_period_data(period_folder):
     
     # Box/Wall breakdown
     logger.info(f"\n  Box and Wall breakdown:")
-    for box_id in sorted(combined['box_id'].unique()):
-        box_data = combined[combined['box_id'] == box_id]
+    for box_id in sorted(sensor_table['box_id'].unique()):
+        box_data = sensor_table[sensor_table['box_id'] == box_id]
         box_sensors = sorted(box_data['sensor_id'].unique())
         logger.info(f"    Box {box_id}: {len(box_sensors)} sensors → {box_sensors}")
         
@@ -355,6 +579,13 @@ def load_period_data(period_folder):
     
     logger.info(f"{'='*80}\n")
     
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        combined.to_parquet(cache_file, engine='pyarrow', compression='zstd', index=False)
+        stamp_file.write_text(stamp)
+    except OSError as e:
+        logger.warning(f"⚠ Could not write period cache {cache_file}: {e}")
+    
     return combined
 
 
@@ -405,18 +636,33 @@ def load_all_periods(base_folder='.'):
         
         # Detailed sensor breakdown
         logger.info(f"\n  Detailed sensor breakdown:")
-        for box_id in sorted(df['box_id'].unique()):
-            box_df = df[df['box_id'] == box_id]
-            sensors = sorted(box_df['sensor_id'].unique())
+        # Per-sensor rows and missing counts from one Arrow group_by over the
+        # summary columns (wall/position are constant per sensor, so min picks them)
+        table = pa.Table.from_pandas(
+            df[['box_id', 'sensor_id', 'wall_id', 'position', 'surface_temp', 'internal_temp', 'room_temp']],
+            preserve_index=False,
+        )
+        only_null = pc.CountOptions(mode='only_null')
+        summary = table.group_by(['box_id', 'sensor_id']).aggregate([
+            ([], 'count_all'),
+            ('wall_id', 'min'),
+            ('position', 'min'),
+            ('surface_temp', 'count', only_null),
+            ('internal_temp', 'count', only_null),
+            ('room_temp', 'count', only_null),
+        ]).sort_by([('box_id', 'ascending'), ('sensor_id', 'ascending')]).to_pylist()
+        
+        sensors_by_box = defaultdict(list)
+        for row in summary:
+            sensors_by_box[row['box_id']].append(row)
+        
+        for box_id, sensors in sensors_by_box.items():
             logger.info(f"    Box {box_id}: {len(sensors)} sensors")
-            for sensor_id in sensors:
-                sensor_df = box_df[box_df['sensor_id'] == sensor_id]
-                wall_id = sensor_df['wall_id'].iloc[0] if len(sensor_df) > 0 else '?'
-                position = sensor_df['position'].iloc[0] if len(sensor_df) > 0 else '?'
-                rows = len(sensor_df)
-                missing_surface = sensor_df['surface_temp'].isna().sum()
-                missing_internal = sensor_df['internal_temp'].isna().sum()
-                missing_room = sensor_df['room_temp'].isna().sum()
+            for row in sensors:
+                sensor_id, wall_id, position, rows = row['sensor_id'], row['wall_id_min'], row['position_min'], row['count_all']
+                missing_surface = row['surface_temp_count']
+                missing_internal = row['internal_temp_count']
+                missing_room = row['room_temp_count']
                 logger.info(f"      Sensor {sensor_id:2d} (Wall {wall_id}, {position:>3}): {rows:5,} rows | Missing: surf={missing_surface}, int={missing_internal}, room={missing_room}")
     
     logger.info(f"\n{'*'*80}\n")
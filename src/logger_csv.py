@@ -0,0 +1,165 @@
+"""
+Raw logger CSV reading shared by src/load.py, reorganize_correct.py and the diagnostics scripts.
+A logger export has 14 metadata lines, then the column header and the data rows.
+"""
+
+import codecs
+import csv
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+
+def sniff_encoding(sample):
+    """Encoding of a file from its first bytes: a BOM, else utf-8 if they decode, else latin-1."""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the sample is still utf-8
+        if e.start < len(sample) - 3:
+            return 'latin-1'
+    return 'utf-8'
+
+
+def read_header_lines(path, sample, encoding, count, newline=None):
+    """
+    The lines of a file up to and including its count-th non-blank line, taken from
+    the sniffed sample when it covers them. Blank lines are kept but not counted, as
+    with pd.read_csv(header=...), so for count = header_row + 1 the column header is
+    lines[-1] and the data starts after len(lines) lines.
+    Line endings are translated to '\\n' as in text mode; newline='' keeps them as written.
+    Raises ValueError if the file ends first.
+    """
+    lines = _lines_through(io.StringIO(sample.decode(encoding, errors='ignore'), newline=newline), count)
+    if lines is None or not lines[-1].endswith('\n'):
+        # Header runs past the sample: read it from the file
+        with open(path, 'r', encoding=encoding, errors='ignore', newline=newline) as f:
+            lines = _lines_through(f, count)
+        if lines is None:
+            raise ValueError(f"File has no header line (expected as non-blank line {count})")
+    return lines
+
+
+def _lines_through(f, count):
+    """Lines read from f through its count-th non-blank line, or None if f ends first."""
+    lines = []
+    for line in f:
+        lines.append(line)
+        if line.strip():
+            count -= 1
+            if count == 0:
+                return lines
+    return None
+
+
+def stripped_names(header_line):
+    """Column names from a CSV header line, with surrounding whitespace removed."""
+    return [name.strip() for name in next(csv.reader([header_line]))]
+
+
+def _skip_row(row):
+    """Arrow invalid_row_handler: drop the malformed row and keep parsing."""
+    return 'skip'
+
+
+def read_logger_table(source, encoding, header_row=14, column_names=None, include_columns=None,
+                      timestamp_parsers=None, column_types=None):
+    """
+    Parse a logger CSV (header_row lines before the column header, blank ones
+    included) into an Arrow table with Arrow's multithreaded CSV reader. Empty fields
+    become nulls, as with pd.read_csv. Rows with the wrong number of fields, such as
+    a one-field "end of mission" trailer, are skipped instead of failing the whole
+    file (pandas read them as mostly-empty rows, which the loaders drop anyway).
+    Given column_names, the header line is skipped and those
+    names are used instead. include_columns limits parsing to those columns, and
+    timestamp_parsers and column_types are passed on to Arrow's ConvertOptions, e.g.
+    to type the temperatures, parse Date/Time at ingest or dictionary-encode Wall Type.
+    """
+    return pa_csv.read_csv(
+        source,
+        read_options=pa_csv.ReadOptions(
+            skip_rows=header_row + (column_names is not None), column_names=column_names, encoding=encoding
+        ),
+        parse_options=pa_csv.ParseOptions(invalid_row_handler=_skip_row),
+        convert_options=pa_csv.ConvertOptions(
+            strings_can_be_null=True, include_columns=include_columns,
+            timestamp_parsers=timestamp_parsers, column_types=column_types,
+        ),
+    )
+
+
+def read_logger_csv(source, encoding, header_row=14, column_names=None, timestamp_parsers=None, column_types=None):
+    """read_logger_table as a pandas DataFrame."""
+    return read_logger_table(
+        source, encoding, header_row, column_names,
+        timestamp_parsers=timestamp_parsers, column_types=column_types,
+    ).to_pandas()
+
+
+def read_with_header_skip(path, header_row=14, sample_size=4096, timestamp_parsers=None, column_types=None):
+    """
+    Read a logger CSV whose column header is non-blank line header_row + 1.
+    The encoding is sniffed once from the first bytes instead of attempting a full
+    parse per candidate, and the metadata lines above the header come from the same bytes.
+    timestamp_parsers and column_types are passed on to read_logger_csv.
+    Returns (df, header_lines, encoding).
+    """
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+    encoding = sniff_encoding(sample)
+    
+    # Column names are stripped once from the header line rather than on the frame afterwards
+    lines = read_header_lines(path, sample, encoding, header_row + 1)
+    try:
+        df = read_logger_csv(path, encoding, len(lines) - 1, stripped_names(lines[-1]),
+                             timestamp_parsers=timestamp_parsers, column_types=column_types)
+    except (pa.ArrowInvalid, UnicodeDecodeError):
+        if encoding != 'utf-8':
+            raise
+        # Non-utf-8 bytes after the sniffed sample; latin-1 accepts any byte
+        encoding = 'latin-1'
+        lines = read_header_lines(path, sample, encoding, header_row + 1)
+        df = read_logger_csv(path, encoding, len(lines) - 1, stripped_names(lines[-1]),
+                             timestamp_parsers=timestamp_parsers, column_types=column_types)
+    
+    return df, lines[:-1], encoding
+
+
+def floats_as_text(df):
+    """
+    df with its float columns as the text pandas' to_csv writes for them ('21.0',
+    '0.1'), so Arrow's CSV writer keeps the source formatting instead of writing
+    whole numbers as '21'. Missing values stay null and are written empty.
+    """
+    float_columns = df.columns[[pd.api.types.is_float_dtype(dtype) for dtype in df.dtypes]]
+    if len(float_columns) == 0:
+        return df
+    df = df.copy(deep=False)
+    for col in float_columns:
+        df[col] = df[col].astype(str).where(df[col].notna())
+    return df
+
+
+def read_raw_csv(filepath, encoding=None):
+    """
+    Read a logger CSV (data starts after 14 header lines) with pandas.
+    The file is read from disk once and parsed from memory; with encoding=None the
+    encoding is sniffed from those bytes and a failed utf-8 parse is retried as
+    latin-1 on the same buffer.
+    """
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    
+    try:
+        return pd.read_csv(io.BytesIO(raw), header=14, encoding=encoding or sniff_encoding(raw[:262144]))
+    except UnicodeDecodeError:
+        if encoding is not None:
+            raise
+        # Non-utf-8 bytes after the sniffed sample; latin-1 accepts any byte
+        return pd.read_csv(io.BytesIO(raw), header=14, encoding='latin-1')
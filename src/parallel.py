@@ -0,0 +1,20 @@
+"""
+Process-pool helper shared by the loaders and diagnostics scripts.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+
+def parallel_map(fn, items, *args, chunksize=1):
+    """
+    fn(item, *args) for every item, run in worker processes (one per CPU, at most
+    one per item). Results keep the order of items.
+    fn must be a module-level function so the workers can unpickle it.
+    """
+    items = list(items)
+    if not items:
+        return []
+    max_workers = max(1, min(len(items), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fn, items, *([arg] * len(items) for arg in args), chunksize=chunksize))
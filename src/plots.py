@@ -8,6 +8,12 @@ import pandas as pd
 import numpy as np
 from src.transform import calculate_thermal_lag, detect_wall_type_changes
 
+# Optional: compiled MinMax-LTTB for downsample_lttb (falls back to the numpy LTTB)
+try:
+    from tsdownsample import MinMaxLTTBDownsampler
+except ImportError:
+    MinMaxLTTBDownsampler = None
+
 
 # Color schemes - optimized for visibility and contrast
 BOX_COLORS = {
@@ -38,9 +44,149 @@ POSITION_COLORS = {
 
 ROOM_TEMP_COLOR = '#6C757D'  # Gray for room temperature
 
+# Max points sent to the browser per timeline trace
+MAX_POINTS_PER_TRACE = 2000
+
+# Max points per sensor line in the diagnostic overlay (16 sensors share two traces)
+MAX_POINTS_PER_SENSOR = 800
+
+
+def downsample_lttb(x, y, n_out=MAX_POINTS_PER_TRACE):
+    """
+    Downsample a line series with Largest-Triangle-Three-Buckets (LTTB).
+    Keeps first/last points and, per bucket, the point forming the largest
+    triangle with its neighbours, so peaks and dips survive.
+    Uses tsdownsample's MinMax-LTTB when installed, else numpy. Returns (x, y) as numpy arrays.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    
+    if n_out is None or n <= n_out or n_out < 3:
+        return x, y
+    
+    # Numeric x for the triangle areas (datetimes as int64)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x_int = x.astype('datetime64[ns]').astype(np.int64)
+    else:
+        x_int = x
+    
+    if MinMaxLTTBDownsampler is not None and not np.isnan(y).any():
+        selected = MinMaxLTTBDownsampler().downsample(x_int, y, n_out=n_out)
+        return x[selected], y[selected]
+    
+    x_num = x_int.astype(float)
+    
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    
+    # Average point of every "next" bucket (the last bucket looks at the final point),
+    # all in one reduceat pass; NaN values are left out of the y average
+    valid = ~np.isnan(y)
+    next_sizes = np.diff(np.append(edges[1:], n))
+    avg_x = np.add.reduceat(x_num, edges[1:]) / next_sizes
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_y = np.add.reduceat(np.where(valid, y, 0), edges[1:]) / np.add.reduceat(valid, edges[1:])
+    
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        
+        # Triangle area for every candidate in this bucket
+        area = np.abs(
+            (x_num[a] - avg_x[i]) * (y[start:end] - y[a])
+            - (x_num[a] - x_num[start:end]) * (avg_y[i] - y[a])
+        )
+        # NaN areas lose, so a gap is only kept when the whole bucket is NaN
+        area = np.where(np.isnan(area), -1, area)
+        
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    
+    return x[selected], y[selected]
+
+
+def concat_segments(segments):
+    """
+    Join several line segments into one trace, separated by NaN gaps.
+    segments: list of (label, x, y). Returns (x, y, labels) numpy arrays,
+    where labels repeats each segment's label per point (for customdata/hover).
+    """
+    xs, ys, labels = [], [], []
+    
+    for label, x, y in segments:
+        x = np.asarray(x)
+        y = np.asarray(y, dtype=float)
+        if len(x) == 0:
+            continue
+        
+        # Repeat the last x with a NaN y so the line breaks before the next segment
+        xs.extend([x, x[-1:]])
+        ys.extend([y, [np.nan]])
+        labels.append(np.full(len(x) + 1, label))
+    
+    if not xs:
+        return np.array([]), np.array([]), np.array([])
+    
+    return np.concatenate(xs), np.concatenate(ys), np.concatenate(labels)
+
+
+def plot_columns(data, columns):
+    """
+    Projection of data onto the columns a plot reads (those present, in order),
+    so per-box/per-wall slicing and sorting copy only these columns.
+    """
+    return data[[col for col in dict.fromkeys(columns) if col in data.columns]]
+
+
+def add_wall_type_markers(fig, changes):
+    """
+    Mark wall type changes with a vertical line and a "→ <type>" label.
+    All lines are one NaN-separated trace on a hidden 0-1 axis overlaying y
+    (full plot height at any zoom), and all labels are set in one update_layout call.
+    """
+    if not changes:
+        return fig
+    
+    times = [ts for ts, _ in changes]
+    fig.add_trace(go.Scattergl(
+        x=np.repeat(np.array(times, dtype='datetime64[ns]'), 3),
+        y=np.tile([0.0, 1.0, np.nan], len(times)),
+        yaxis='y2',
+        mode='lines',
+        line=dict(color="rgba(128, 128, 128, 0.4)", width=2, dash="solid"),
+        connectgaps=False,
+        showlegend=False,
+        hoverinfo='skip',
+    ))
+    
+    annotations = [
+        dict(
+            x=ts,
+            y=1,
+            yref='paper',
+            text=f"→ {wall_type}",
+            showarrow=False,
+            yshift=10,
+            font=dict(size=10, color="black"),
+            bgcolor="rgba(255, 255, 255, 0.8)",
+        )
+        for ts, wall_type in changes
+    ]
+    
+    fig.update_layout(
+        yaxis2=dict(overlaying='y', range=[0, 1], visible=False, fixedrange=True),
+        annotations=list(fig.layout.annotations) + annotations,
+    )
+    return fig
+
 
 def plot_timeline_box(data, normalized=False, smoothing=None, 
-                      include_room=True, include_surface=False, wall_comparison=False, wall_id=None):
+                      include_room=True, include_surface=False, wall_comparison=False, wall_id=None, changes=None):
     """
     Plot timeline for box-level data.
     
@@ -50,6 +196,7 @@ def plot_timeline_box(data, normalized=False, smoothing=None,
     - include_surface: Show surface temperature lines (dashed)
     - wall_comparison: If True, compare same wall across both boxes
     - wall_id: When wall_comparison=True, which wall to compare (1-4)
+    - changes: Precomputed detect_wall_type_changes result for box 2 (detected here if None)
     """
     fig = go.Figure()
     
@@ -66,19 +213,23 @@ def plot_timeline_box(data, normalized=False, smoothing=None,
     # Use smoothed columns if available
     internal_col = f'{internal_var}_smooth' if smoothing and f'{internal_var}_smooth' in data.columns else internal_var
     surface_col = f'{surface_var}_smooth' if smoothing and f'{surface_var}_smooth' in data.columns else surface_var
+    plot_data = plot_columns(data, ['timestamp', 'box_id', internal_col, surface_col, 'wall_type'])
+    
+    # Row positions of each box, found in one groupby pass
+    box_rows = plot_data.groupby('box_id').indices
     
     # Plot box internal temps (solid lines)
     for box_id in [1, 2]:
-        box_data = data[data['box_id'] == box_id].sort_values('timestamp')
-        
-        if len(box_data) == 0:
+        if box_id not in box_rows:
             continue
+        box_data = plot_data.iloc[box_rows[box_id]].sort_values('timestamp')
         
         box_name = 'Control' if box_id == 1 else 'Experimental'
         
-        fig.add_trace(go.Scatter(
-            x=box_data['timestamp'],
-            y=box_data[internal_col],
+        x, y = downsample_lttb(box_data['timestamp'], box_data[internal_col])
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
             mode='lines',
             name=f'{box_name} - Internal Temp',
             line=dict(color=BOX_COLORS[box_id]['internal'], width=2.5),
@@ -88,9 +239,10 @@ def plot_timeline_box(data, normalized=False, smoothing=None,
         # Add surface temps if requested (dashed lines)
         if include_surface and surface_var in data.columns:
             # Use same color as internal temp for better matching
-            fig.add_trace(go.Scatter(
-                x=box_data['timestamp'],
-                y=box_data[surface_col],
+            x, y = downsample_lttb(box_data['timestamp'], box_data[surface_col])
+            fig.add_trace(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines',
                 name=f'{box_name} - Surface Temp (Inside sensors)',
                 line=dict(color=BOX_COLORS[box_id]['internal'], width=2, dash='dash'),
@@ -101,10 +253,11 @@ def plot_timeline_box(data, normalized=False, smoothing=None,
     if include_room and 'room_temp' in data.columns and not normalized:
         # Average room temp across boxes (should be identical)
         room_data = data.groupby('timestamp')['room_temp'].mean().reset_index()
+        x, y = downsample_lttb(room_data['timestamp'], room_data['room_temp'])
         
-        fig.add_trace(go.Scatter(
-            x=room_data['timestamp'],
-            y=room_data['room_temp'],
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
             mode='lines',
             name='Room Temperature',
             line=dict(color=ROOM_TEMP_COLOR, width=2.5, dash='dot'),
@@ -121,27 +274,10 @@ def plot_timeline_box(data, normalized=False, smoothing=None,
         )
     
     # Add wall type change markers for experimental box (box 2)
-    exp_data = data[data['box_id'] == 2].sort_values('timestamp')
-    if len(exp_data) > 0 and 'wall_type' in exp_data.columns:
-        changes = detect_wall_type_changes(exp_data)
-        for ts, wall_type in changes:
-            fig.add_vline(
-                x=ts,
-                line_width=2,
-                line_dash="solid",
-                line_color="rgba(128, 128, 128, 0.4)",
-            )
-            # Add annotation separately to avoid timestamp arithmetic issues
-            fig.add_annotation(
-                x=ts,
-                y=1,
-                yref='paper',
-                text=f"→ {wall_type}",
-                showarrow=False,
-                yshift=10,
-                font=dict(size=10, color="black"),
-                bgcolor="rgba(255, 255, 255, 0.8)",
-            )
+    if changes is None and 2 in box_rows and 'wall_type' in plot_data.columns:
+        changes = detect_wall_type_changes(plot_data.iloc[box_rows[2]].sort_values('timestamp'))
+    if changes:
+        add_wall_type_markers(fig, changes)
     
     title = 'Box-Level Temperature Timeline'
     if normalized:
@@ -159,10 +295,11 @@ def plot_timeline_box(data, normalized=False, smoothing=None,
     return fig
 
 
-def plot_timeline_wall_comparison(wall_data, wall_id, normalized=False, smoothing=None):
+def plot_timeline_wall_comparison(wall_data, wall_id, normalized=False, smoothing=None, changes=None):
     """
     Plot timeline comparing the same wall across both boxes.
     E.g., Wall 1 in Control vs Wall 1 in Experimental
+    changes: precomputed wall type changes of this wall in box 2 (detected here if None).
     """
     fig = go.Figure()
     
@@ -182,22 +319,28 @@ def plot_timeline_wall_comparison(wall_data, wall_id, normalized=False, smoothin
     internal_col = f'{internal_var}_smooth' if smoothing and f'{internal_var}_smooth' in wall_data.columns else internal_var
     surface_col = f'{surface_var}_smooth' if smoothing and f'{surface_var}_smooth' in wall_data.columns else surface_var
     out_surface_col = f'{out_surface_var}_smooth' if smoothing and f'{out_surface_var}_smooth' in wall_data.columns else out_surface_var
+    plot_data = plot_columns(
+        wall_data, ['timestamp', 'box_id', 'wall_id', internal_col, surface_col, out_surface_col, 'wall_type']
+    )
+    
+    # Row positions of each (box, wall), found in one groupby pass
+    group_rows = plot_data.groupby(['box_id', 'wall_id']).indices
     
     # Plot both boxes for the same wall
     for box_id in [1, 2]:
-        wall_subset = wall_data[(wall_data['box_id'] == box_id) & (wall_data['wall_id'] == wall_id)].sort_values('timestamp')
-        
-        if len(wall_subset) == 0:
+        if (box_id, wall_id) not in group_rows:
             continue
+        wall_subset = plot_data.iloc[group_rows[(box_id, wall_id)]].sort_values('timestamp')
         
         box_name = 'Control' if box_id == 1 else 'Experimental'
         # Use same base color for all three temps within each box for visual consistency
         base_color = WALL_COMPARISON_COLORS[wall_id][f'box{box_id}']
         
         # Internal temp (solid line)
-        fig.add_trace(go.Scatter(
-            x=wall_subset['timestamp'],
-            y=wall_subset[internal_col],
+        x, y = downsample_lttb(wall_subset['timestamp'], wall_subset[internal_col])
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
             mode='lines',
             name=f'{box_name} - Internal',
             line=dict(color=base_color, width=2.5),
@@ -206,9 +349,10 @@ def plot_timeline_wall_comparison(wall_data, wall_id, normalized=False, smoothin
         
         # Inside Surface temp (dashed line)
         if surface_var in wall_data.columns:
-            fig.add_trace(go.Scatter(
-                x=wall_subset['timestamp'],
-                y=wall_subset[surface_col],
+            x, y = downsample_lttb(wall_subset['timestamp'], wall_subset[surface_col])
+            fig.add_trace(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines',
                 name=f'{box_name} - Inside Surface',
                 line=dict(color=base_color, width=2, dash='dash'),
@@ -217,9 +361,10 @@ def plot_timeline_wall_comparison(wall_data, wall_id, normalized=False, smoothin
         
         # Outside Surface temp (dotted line)
         if out_surface_var in wall_data.columns:
-            fig.add_trace(go.Scatter(
-                x=wall_subset['timestamp'],
-                y=wall_subset[out_surface_col],
+            x, y = downsample_lttb(wall_subset['timestamp'], wall_subset[out_surface_col])
+            fig.add_trace(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines',
                 name=f'{box_name} - Outside Surface',
                 line=dict(color=base_color, width=2, dash='dot'),
@@ -227,27 +372,10 @@ def plot_timeline_wall_comparison(wall_data, wall_id, normalized=False, smoothin
             ))
     
     # Add wall type change markers
-    exp_wall = wall_data[(wall_data['box_id'] == 2) & (wall_data['wall_id'] == wall_id)].sort_values('timestamp')
-    if len(exp_wall) > 0 and 'wall_type' in exp_wall.columns:
-        changes = detect_wall_type_changes(exp_wall)
-        for ts, wall_type in changes:
-            fig.add_vline(
-                x=ts,
-                line_width=2,
-                line_dash="solid",
-                line_color="rgba(128, 128, 128, 0.4)",
-            )
-            # Add annotation separately to avoid timestamp arithmetic issues
-            fig.add_annotation(
-                x=ts,
-                y=1,
-                yref='paper',
-                text=f"→ {wall_type}",
-                showarrow=False,
-                yshift=10,
-                font=dict(size=10, color="black"),
-                bgcolor="rgba(255, 255, 255, 0.8)",
-            )
+    if changes is None and (2, wall_id) in group_rows and 'wall_type' in plot_data.columns:
+        changes = detect_wall_type_changes(plot_data.iloc[group_rows[(2, wall_id)]].sort_values('timestamp'))
+    if changes:
+        add_wall_type_markers(fig, changes)
     
     title = f'Wall {wall_id} Comparison: Control vs Experimental'
     if normalized:
@@ -265,10 +393,12 @@ def plot_timeline_wall_comparison(wall_data, wall_id, normalized=False, smoothin
     return fig
 
 
-def plot_timeline_wall(data, walls=None, box_id=2, smoothing=None, show_internal=True, show_in_surface=True, show_out_surface=False):
+def plot_timeline_wall(data, walls=None, box_id=2, smoothing=None, show_internal=True, show_in_surface=True, show_out_surface=False,
+                       changes=None):
     """
     Plot timeline for individual walls within one box.
     Shows internal, inside surface, and/or outside surface temperatures for each wall.
+    changes: precomputed wall type changes of box 2 (detected here if None).
     """
     fig = go.Figure()
     
@@ -284,16 +414,25 @@ def plot_timeline_wall(data, walls=None, box_id=2, smoothing=None, show_internal
     in_surface_col = f'{in_surface_var}_smooth' if smoothing and f'{in_surface_var}_smooth' in data.columns else in_surface_var
     out_surface_col = f'{out_surface_var}_smooth' if smoothing and f'{out_surface_var}_smooth' in data.columns else out_surface_var
     
+    # Rows of this box, and the row positions of each of its walls (one groupby pass)
+    plot_data = plot_columns(
+        data, ['timestamp', 'box_id', 'wall_id', internal_col, in_surface_col, out_surface_col, 'wall_type']
+    )
+    box_data = plot_data[plot_data['box_id'] == box_id]
+    wall_rows = box_data.groupby('wall_id').indices
+    
     # Add averaged internal temp line (all walls have same internal temp)
     if show_internal:
-        # Get all selected walls data and average the internal temp
-        all_walls_data = data[(data['box_id'] == box_id) & (data['wall_id'].isin(walls))]
-        if len(all_walls_data) > 0:
+        # Get all selected walls data (in their original row order) and average the internal temp
+        selected_rows = [wall_rows[wall_id] for wall_id in walls if wall_id in wall_rows]
+        if selected_rows:
+            all_walls_data = box_data.iloc[np.sort(np.concatenate(selected_rows))]
             avg_internal = all_walls_data.groupby('timestamp')[internal_col].mean().reset_index()
+            x, y = downsample_lttb(avg_internal['timestamp'], avg_internal[internal_col])
             
-            fig.add_trace(go.Scatter(
-                x=avg_internal['timestamp'],
-                y=avg_internal[internal_col],
+            fig.add_trace(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines',
                 name='Internal Temp (All Walls Average)',
                 line=dict(color='#2D3748', width=2),
@@ -302,18 +441,18 @@ def plot_timeline_wall(data, walls=None, box_id=2, smoothing=None, show_internal
     
     # Add surface temps for each wall
     for wall_id in walls:
-        wall_data = data[(data['box_id'] == box_id) & (data['wall_id'] == wall_id)].sort_values('timestamp')
-        
-        if len(wall_data) == 0:
+        if wall_id not in wall_rows:
             continue
+        wall_data = box_data.iloc[wall_rows[wall_id]].sort_values('timestamp')
         
         color = WALL_COLORS.get(wall_id, 'gray')
         
         # Inside surface temp (dashed)
         if show_in_surface and in_surface_var in data.columns:
-            fig.add_trace(go.Scatter(
-                x=wall_data['timestamp'],
-                y=wall_data[in_surface_col],
+            x, y = downsample_lttb(wall_data['timestamp'], wall_data[in_surface_col])
+            fig.add_trace(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines',
                 name=f'Wall {wall_id} - Inside Surface',
                 line=dict(color=color, width=2, dash='dash'),
@@ -322,9 +461,10 @@ def plot_timeline_wall(data, walls=None, box_id=2, smoothing=None, show_internal
         
         # Outside surface temp (dotted)
         if show_out_surface and out_surface_var in data.columns:
-            fig.add_trace(go.Scatter(
-                x=wall_data['timestamp'],
-                y=wall_data[out_surface_col],
+            x, y = downsample_lttb(wall_data['timestamp'], wall_data[out_surface_col])
+            fig.add_trace(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines',
                 name=f'Wall {wall_id} - Outside Surface',
                 line=dict(color=color, width=1.5, dash='dot'),
@@ -333,27 +473,10 @@ def plot_timeline_wall(data, walls=None, box_id=2, smoothing=None, show_internal
     
     # Add wall type change markers (for experimental box)
     if box_id == 2:
-        box_subset = data[data['box_id'] == box_id]
-        if len(box_subset) > 0 and 'wall_type' in box_subset.columns:
-            changes = detect_wall_type_changes(box_subset)
-            for ts, wall_type in changes:
-                fig.add_vline(
-                    x=ts,
-                    line_width=2,
-                    line_dash="solid",
-                    line_color="rgba(128, 128, 128, 0.4)",
-                )
-                # Add annotation separately to avoid timestamp arithmetic issues
-                fig.add_annotation(
-                    x=ts,
-                    y=1,
-                    yref='paper',
-                    text=f"→ {wall_type}",
-                    showarrow=False,
-                    yshift=10,
-                    font=dict(size=10, color="black"),
-                    bgcolor="rgba(255, 255, 255, 0.8)",
-                )
+        if changes is None and len(box_data) > 0 and 'wall_type' in box_data.columns:
+            changes = detect_wall_type_changes(box_data)
+        if changes:
+            add_wall_type_markers(fig, changes)
     
     box_name = 'Control' if box_id == 1 else 'Experimental'
     fig.update_layout(
@@ -379,7 +502,7 @@ def plot_sandwich_view(data, box_id=2, wall_ids=None):
     - Correlation (r) indicates how similar the patterns are (1.0 = identical shape)
     - NOW GROUPED BY WALL TYPE instead of individual walls
     """
-    box_data = data[data['box_id'] == box_id].copy()
+    box_data = data[data['box_id'] == box_id]
     
     if len(box_data) == 0:
         return go.Figure()
@@ -398,24 +521,24 @@ def plot_sandwich_view(data, box_id=2, wall_ids=None):
         vertical_spacing=0.08,
     )
     
+    # Average across all walls of the same type per timestamp, for every wall type in one groupby
+    surface_means = box_data.groupby(['wall_type', 'timestamp'], observed=True, as_index=False).agg({
+        'out_surface': 'mean',
+        'in_surface': 'mean'
+    })
+    aggregated_by_type = dict(iter(surface_means.groupby('wall_type', observed=True, sort=False)))
+    
     for idx, wall_type in enumerate(wall_types, 1):
-        # Get data for this wall type (aggregate across all walls with this type)
-        wall_type_data = box_data[box_data['wall_type'] == wall_type].sort_values('timestamp')
-        
-        if len(wall_type_data) == 0:
+        if wall_type not in aggregated_by_type:
             continue
-        
-        # Aggregate by timestamp (average across all walls of same type)
-        aggregated = wall_type_data.groupby('timestamp').agg({
-            'out_surface': 'mean',
-            'in_surface': 'mean'
-        }).reset_index()
+        aggregated = aggregated_by_type[wall_type].drop(columns='wall_type').reset_index(drop=True)
         
         # Outside Surface (heat arriving at exterior)
         if 'out_surface' in aggregated.columns:
-            fig.add_trace(go.Scatter(
-                x=aggregated['timestamp'],
-                y=aggregated['out_surface'],
+            x, y = downsample_lttb(aggregated['timestamp'], aggregated['out_surface'])
+            fig.add_trace(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines',
                 name='Outside Surface' if idx == 1 else None,
                 line=dict(color='#E63946', width=2.5),
@@ -425,9 +548,10 @@ def plot_sandwich_view(data, box_id=2, wall_ids=None):
         
         # Inside Surface (heat arriving at interior)
         if 'in_surface' in aggregated.columns:
-            fig.add_trace(go.Scatter(
-                x=aggregated['timestamp'],
-                y=aggregated['in_surface'],
+            x, y = downsample_lttb(aggregated['timestamp'], aggregated['in_surface'])
+            fig.add_trace(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines',
                 name='Inside Surface' if idx == 1 else None,
                 line=dict(color='#118AB2', width=2.5),
@@ -712,35 +836,53 @@ def plot_diagnostic_overlay(data, box_id=1, y_var='internal_temp'):
     """
     Plot all 16 sensors as semi-transparent lines with box average highlighted.
     Sensors are colored by position (outside=red, inside=blue).
+    All sensors of one position share a single NaN-separated trace.
     """
     fig = go.Figure()
     
-    # Individual sensors (more visible, less transparent)
-    for sensor_id in range(1, 17):
-        sensor_data = data[(data['box_id'] == box_id) & (data['sensor_id'] == sensor_id)].sort_values('timestamp')
-        
-        if len(sensor_data) == 0:
-            continue
-        
+    # Collect each sensor's line, grouped by position (one trace per color).
+    # One sort by (sensor, time) puts every sensor in a contiguous slice of the arrays
+    box_data = data[data['box_id'] == box_id]
+    sorted_data = box_data.sort_values(['sensor_id', 'timestamp'])
+    sensor_ids = sorted_data['sensor_id'].to_numpy()
+    timestamps = sorted_data['timestamp'].to_numpy()
+    values = sorted_data[y_var].to_numpy()
+    positions = sorted_data['position'].to_numpy() if 'position' in sorted_data.columns else None
+    
+    starts = np.flatnonzero(np.r_[True, sensor_ids[1:] != sensor_ids[:-1]]) if len(sensor_ids) > 0 else []
+    ends = np.r_[starts[1:], len(sensor_ids)]
+    segments = {}
+    for start, end in zip(starts, ends):
         # Determine position for color
-        position = sensor_data['position'].iloc[0] if 'position' in sensor_data.columns else 'unknown'
-        color = POSITION_COLORS.get(position, 'gray')
+        position = positions[start] if positions is not None else 'unknown'
+        x, y = downsample_lttb(timestamps[start:end], values[start:end], n_out=MAX_POINTS_PER_SENSOR)
+        segments.setdefault(position, []).append((sensor_ids[start], x, y))
+    
+    position_names = {'out': 'Outside Sensors', 'in': 'Inside Sensors'}
+    
+    # Individual sensors (more visible, less transparent)
+    for position, position_segments in segments.items():
+        x, y, sensor_ids = concat_segments(position_segments)
         
-        fig.add_trace(go.Scatter(
-            x=sensor_data['timestamp'],
-            y=sensor_data[y_var],
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
+            customdata=sensor_ids,
             mode='lines',
-            name=f'S{sensor_id}',
-            line=dict(color=color, width=1),
+            name=position_names.get(position, 'Sensors'),
+            line=dict(color=POSITION_COLORS.get(position, 'gray'), width=1),
             opacity=0.5,  # Increased from 0.3
+            connectgaps=False,
+            hovertemplate='S%{customdata}<br>%{x}<br>%{y:.2f}<extra></extra>',
         ))
     
     # Box average (less bold, more subtle)
-    box_avg = data[data['box_id'] == box_id].groupby('timestamp')[y_var].mean().reset_index()
+    box_avg = box_data.groupby('timestamp')[y_var].mean().reset_index()
+    x, y = downsample_lttb(box_avg['timestamp'], box_avg[y_var])
     
-    fig.add_trace(go.Scatter(
-        x=box_avg['timestamp'],
-        y=box_avg[y_var],
+    fig.add_trace(go.Scattergl(
+        x=x,
+        y=y,
         mode='lines',
         name='Box Average',
         line=dict(color='#2D3748', width=2.5, dash='solid'),  # Reduced from 3, darker gray
@@ -761,7 +903,7 @@ def plot_diagnostic_overlay(data, box_id=1, y_var='internal_temp'):
         xaxis_title='Time',
         yaxis_title=y_label,
         height=500,
-        hovermode='x unified',
+        hovermode='closest',  # Merged sensor traces: hover picks the nearest sensor line
         showlegend=False,
     )
     
@@ -837,7 +979,7 @@ def create_summary_table(data):
     if 'wall_type' not in data.columns:
         return None
     
-    summary = data.groupby(['period', 'wall_type']).agg({
+    summary = data.groupby(['period', 'wall_type'], observed=True).agg({
         'out_normalized_internal': ['mean', 'std'],
         'in_normalized_internal': ['mean', 'std'],
         'surface_gradient': ['mean', 'std'],
@@ -934,7 +1076,7 @@ def plot_thermal_gradient_normalized(data, periods=None, normalized=False):
     
     # Plot deltas over time for each wall type
     for wall_type in wall_types:
-        wall_data_filtered = filtered[filtered['wall_type'] == wall_type].copy()
+        wall_data_filtered = filtered[filtered['wall_type'] == wall_type]
         
         if len(wall_data_filtered) == 0:
             continue
@@ -963,7 +1105,7 @@ def plot_thermal_gradient_normalized(data, periods=None, normalized=False):
             aggregated['total_delta'] = aggregated[room_temp_col] - aggregated[internal_col]
         
         # Plot Surface Delta
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=aggregated['timestamp'],
             y=aggregated['surface_delta'],
             mode='lines',
@@ -975,7 +1117,7 @@ def plot_thermal_gradient_normalized(data, periods=None, normalized=False):
         ), row=1, col=1)
         
         # Plot Total Delta
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=aggregated['timestamp'],
             y=aggregated['total_delta'],
             mode='lines',
@@ -1022,7 +1164,7 @@ def plot_temperature_relationship(data, periods=None, x_var='room_temp', y_var='
     if periods is None:
         periods = data['period'].unique()
     
-    filtered = data[data['period'].isin(periods)].copy()
+    filtered = data[data['period'].isin(periods)]
     
     # Map variable names to column names
     var_mapping = {
@@ -8,6 +8,12 @@ import numpy as np
 import logging
 import sys
 
+# Optional: C moving-window mean for apply_smoothing (falls back to pandas rolling)
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -71,7 +77,7 @@ def resample_to_10min(df, periods_data=None):
     if 'wall_type' in df.columns:
         agg_dict['wall_type'] = lambda x: x.mode()[0] if len(x.mode()) > 0 else x.iloc[0]
     
-    resampled = df.groupby(group_cols, dropna=False).agg(agg_dict).reset_index()
+    resampled = df.groupby(group_cols, dropna=False, observed=True).agg(agg_dict).reset_index()
     
     # Rename t_bin to timestamp
     resampled = resampled.rename(columns={'t_bin': 'timestamp'})
@@ -254,7 +260,7 @@ def aggregate_wall_level(df):
         agg_dict['wall_type'] = lambda x: x.mode()[0] if len(x.mode()) > 0 else x.iloc[0]
     
     logger.info(f"  Grouping by: {group_cols}")
-    wall_pos = df.groupby(group_cols, dropna=False).agg(agg_dict).reset_index()
+    wall_pos = df.groupby(group_cols, dropna=False, observed=True).agg(agg_dict).reset_index()
     wall_pos = wall_pos.rename(columns={'sensor_id': 'sensor_count'})
     
     logger.info(f"  Position-level rows: {len(wall_pos):,}")
@@ -262,7 +268,7 @@ def aggregate_wall_level(df):
     # Pivot to get outside and inside columns
     wall_data = []
     
-    for (period, box, wall, ts), group in wall_pos.groupby(['period', 'box_id', 'wall_id', 'timestamp']):
+    for (period, box, wall, ts), group in wall_pos.groupby(['period', 'box_id', 'wall_id', 'timestamp'], observed=True):
         row = {
             'period': period,
             'box_id': box,
@@ -339,26 +345,26 @@ def aggregate_box_level(df):
     if 'normalized_internal' in df.columns:
         agg_dict['normalized_internal'] = 'mean'
     
-    box_df = df.groupby(group_cols, dropna=False).agg(agg_dict).reset_index()
+    box_df = df.groupby(group_cols, dropna=False, observed=True).agg(agg_dict).reset_index()
     box_df = box_df.rename(columns={'sensor_id': 'sensor_count'})
     
     # For surface temp, average only 'in' position sensors
     if 'position' in df.columns:
         logger.info(f"  Calculating surface_temp from 'in' position sensors only")
-        in_sensors = df[df['position'] == 'in'].copy()
+        in_sensors = df[df['position'] == 'in']
         
         in_agg = {'surface_temp': 'mean'}
         if 'normalized_surface' in in_sensors.columns:
             in_agg['normalized_surface'] = 'mean'
         
-        in_df = in_sensors.groupby(group_cols, dropna=False).agg(in_agg).reset_index()
+        in_df = in_sensors.groupby(group_cols, dropna=False, observed=True).agg(in_agg).reset_index()
         
         # Merge with box_df
         box_df = box_df.merge(in_df, on=group_cols, how='left')
     else:
         # Fallback: use all sensors
         logger.info(f"  Warning: No 'position' column, using all sensors for surface_temp")
-        surface_agg = df.groupby(group_cols, dropna=False).agg({'surface_temp': 'mean'}).reset_index()
+        surface_agg = df.groupby(group_cols, dropna=False, observed=True).agg({'surface_temp': 'mean'}).reset_index()
         box_df = box_df.merge(surface_agg, on=group_cols, how='left')
     
     logger.info(f"  Box-level rows: {len(box_df):,}")
@@ -368,6 +374,19 @@ def aggregate_box_level(df):
     return box_df
 
 
+def aggregate_box_outside(df):
+    """
+    Box-level outside surface temps from wall-level data: mean across walls
+    per (period, box, timestamp). Used by the Per-Box Detail view.
+    """
+    if df is None or len(df) == 0:
+        return None
+    
+    value_cols = [c for c in ['out_surface', 'out_normalized_surface'] if c in df.columns]
+    
+    return df.groupby(['period', 'box_id', 'timestamp'], observed=True)[value_cols].mean().reset_index()
+
+
 def aggregate_wall_type(df):
     """
     Aggregate by wall type across time ranges.
@@ -377,7 +396,7 @@ def aggregate_wall_type(df):
         return None
     
     # Filter to experimental box
-    exp_df = df[df['box_id'] == 2].copy()
+    exp_df = df[df['box_id'] == 2]
     
     if len(exp_df) == 0:
         return None
@@ -399,7 +418,7 @@ def aggregate_wall_type(df):
         if col.endswith('_surface') or col.endswith('_internal') or col.endswith('_gradient'):
             agg_dict[col] = 'mean'
     
-    wall_type_df = exp_df.groupby(group_cols, dropna=False).agg(agg_dict).reset_index()
+    wall_type_df = exp_df.groupby(group_cols, dropna=False, observed=True).agg(agg_dict).reset_index()
     
     # Flatten multi-index columns
     wall_type_df.columns = ['_'.join(col).strip('_') if isinstance(col, tuple) else col 
@@ -426,23 +445,23 @@ def calculate_thermal_lag(out_series, in_series, max_lag_hours=12):
     out_norm = (out_clean - np.mean(out_clean)) / (np.std(out_clean) + 1e-8)
     in_norm = (in_clean - np.mean(in_clean)) / (np.std(in_clean) + 1e-8)
     
-    # Cross-correlation using numpy (mode='same' equivalent)
-    # numpy.correlate is limited, so we'll use convolution approach
-    correlation = np.correlate(in_norm, out_norm, mode='full')
-    lags = np.arange(-len(out_norm) + 1, len(out_norm))
+    # Candidate lags: inside lagging outside by 0, 1, ... samples
+    n = len(out_norm)
+    lags = np.arange(n)
     
     # Convert lags to minutes (assuming 10-minute intervals)
     lags_minutes = lags * 10
     
     # Search within max_lag window
     max_lag_minutes = max_lag_hours * 60
-    valid_range = (lags_minutes >= 0) & (lags_minutes <= max_lag_minutes)
+    valid_range = lags_minutes <= max_lag_minutes
     
     if not valid_range.any():
         return None, None
     
-    # Find lag with maximum correlation in valid range
-    valid_corr = correlation[valid_range]
+    # Cross-correlation only at the lags in the window: one dot product per lag
+    # (O(n * window)) instead of np.correlate over all 2n - 1 shifts (O(n^2))
+    valid_corr = np.array([np.dot(in_norm[lag:], out_norm[:n - lag]) for lag in lags[valid_range]])
     valid_lags = lags_minutes[valid_range]
     
     max_idx = np.argmax(valid_corr)
@@ -478,19 +497,46 @@ def apply_smoothing(df, columns, window):
     """
     Apply rolling mean smoothing to specified columns.
     window: e.g., '1h', '3h', '12h'
+    
+    The rolling mean runs separately for each period/box/wall series.
     """
     if window is None or window == 'None':
         return df
     
-    df = df.sort_values('timestamp')
+    keys = [k for k in ['period', 'box_id', 'wall_id'] if k in df.columns]
+    columns = [col for col in columns if col in df.columns]
     
-    for col in columns:
-        if col in df.columns:
-            df[f'{col}_smooth'] = df.set_index('timestamp')[col].rolling(window).mean().values
+    df = df.sort_values(keys + ['timestamp'])
+    
+    if columns:
+        step = _regular_step(df, keys)
+        
+        if bn is not None and step is not None:
+            # Evenly spaced series: the time window is a fixed number of rows
+            n_rows = max(int(pd.Timedelta(window) // step), 1)
+            grouped = df.groupby(keys, sort=False, observed=True)[columns] if keys else df[columns]
+            rolled = grouped.transform(lambda s: bn.move_mean(s.to_numpy(), n_rows, min_count=1))
+        elif keys:
+            rolled = df.set_index('timestamp').groupby(keys, sort=False, observed=True)[columns].rolling(window).mean()
+        else:
+            rolled = df.set_index('timestamp')[columns].rolling(window).mean()
+        
+        for col in columns:
+            df[f'{col}_smooth'] = rolled[col].to_numpy()
     
     return df
 
 
+def _regular_step(df, keys):
+    """
+    Common sampling interval of every series in df (sorted by keys + timestamp),
+    or None if the spacing is irregular.
+    """
+    timestamps = df.groupby(keys, sort=False, observed=True)['timestamp'] if keys else df['timestamp']
+    steps = timestamps.diff().dropna().unique()
+    return steps[0] if len(steps) == 1 else None
+
+
 def detect_wall_type_changes(df):
     """
     Detect timestamps where wall type changes.
@@ -504,47 +550,71 @@ def detect_wall_type_changes(df):
     
     df = df.sort_values('timestamp')
     
-    # Detect all changes
-    changes = df[df['wall_type'].ne(df['wall_type'].shift())].copy()
+    # Detect all changes (row differs from the previous row)
+    wall_types = df['wall_type']
+    changed = wall_types.ne(wall_types.shift()).to_numpy()
     
-    if len(changes) == 0:
+    if not changed.any():
         return []
     
-    # Group consecutive changes to the same wall type
-    consolidated = []
-    current_type = None
-    current_timestamps = []
+    change_types = pd.Series(wall_types.to_numpy()[changed])
+    change_times = pd.Series(df['timestamp'].to_numpy()[changed])
     
-    for _, row in changes.iterrows():
-        wall_type = row['wall_type']
-        timestamp = row['timestamp']
-        
-        if wall_type == current_type:
-            # Same type as previous change, accumulate
-            current_timestamps.append(timestamp)
-        else:
-            # Different type - consolidate previous group if any
-            if current_type is not None and current_timestamps:
-                # Use mean timestamp for the transition
-                mean_timestamp = pd.Timestamp(
-                    int(np.mean([ts.value for ts in current_timestamps])),
-                    unit='ns'
-                )
-                consolidated.append((mean_timestamp, current_type))
-            
-            # Start new group
-            current_type = wall_type
-            current_timestamps = [timestamp]
-    
-    # Don't forget the last group
-    if current_type is not None and current_timestamps:
-        mean_timestamp = pd.Timestamp(
-            int(np.mean([ts.value for ts in current_timestamps])),
-            unit='ns'
-        )
-        consolidated.append((mean_timestamp, current_type))
-    
-    return consolidated
+    # Group consecutive changes to the same wall type into one transition
+    new_group = change_types.ne(change_types.shift()).to_numpy()
+    group_ids = new_group.cumsum()
+    
+    # Use mean timestamp for each transition
+    mean_timestamps = change_times.groupby(group_ids).mean()
+    
+    return list(zip(mean_timestamps, change_types[new_group]))
+
+
+def split_by_period(df):
+    """
+    Index a DataFrame by period: {period_name: rows of that period}.
+    One groupby pass, so later lookups are dict access instead of a boolean mask.
+    """
+    if df is None or 'period' not in df.columns:
+        return {}
+    
+    return {period: group for period, group in df.groupby('period', sort=False, observed=True)}
+
+
+def downcast_numeric(df):
+    """
+    Shrink numeric columns in place: float64 -> float32, id columns -> int8.
+    Temperatures (~-10..40°C, 2 decimals) fit float32 comfortably.
+    """
+    if df is None:
+        return df
+    
+    float_cols = df.select_dtypes('float64').columns
+    if len(float_cols) > 0:
+        df[float_cols] = df[float_cols].astype('float32')
+    
+    for col in ['box_id', 'sensor_id', 'wall_id']:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype('int8')
+    
+    return df
+
+
+def categorize_periods(levels):
+    """
+    Convert the 'period' column of every level to one shared ordered
+    categorical, so the list of periods is just the categories.
+    """
+    sensor_df = levels.get('sensor')
+    if sensor_df is None:
+        return levels
+    
+    period_dtype = pd.CategoricalDtype(sorted(sensor_df['period'].unique()), ordered=True)
+    for df in levels.values():
+        if df is not None and 'period' in df.columns:
+            df['period'] = df['period'].astype(period_dtype)
+    
+    return levels
 
 
 def transform_all_data(periods_dict):
@@ -583,15 +653,15 @@ def transform_all_data(periods_dict):
     result = {}
     
     if all_sensor:
-        result['sensor'] = pd.concat(all_sensor, ignore_index=True)
+        result['sensor'] = downcast_numeric(pd.concat(all_sensor, ignore_index=True))
         logger.info(f"Total sensor-level data: {len(result['sensor'])} rows")
     
     if all_wall:
-        result['wall'] = pd.concat(all_wall, ignore_index=True)
+        result['wall'] = downcast_numeric(pd.concat(all_wall, ignore_index=True))
         logger.info(f"Total wall-level data: {len(result['wall'])} rows")
     
     if all_box:
-        result['box'] = pd.concat(all_box, ignore_index=True)
+        result['box'] = downcast_numeric(pd.concat(all_box, ignore_index=True))
         logger.info(f"Total box-level data: {len(result['box'])} rows")
     
-    return result
+    return categorize_periods(result)
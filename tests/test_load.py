@@ -1,45 +1,204 @@
 """
 Test script to validate data loading with Period1 cleaned data.
+Run directly for the full load check; the test_* functions run under pytest.
 """
 from pathlib import Path
-from src.load import load_all_periods
+from src.load import load_all_periods, load_csv_file, parse_mdy_hm, stack_frames
+from src.logger_csv import floats_as_text, read_with_header_skip
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import numpy as np
+import pandas as pd
 
-print("Testing data loading...")
-print("="*80)
 
-base_folder = Path(__file__).parent / 'data_cleaned'
-print(f"Base folder: {base_folder}")
-print(f"Exists: {base_folder.exists()}")
+# Logger export layout: 14 metadata lines, the column header, then the rows
+METADATA = [
+    '1-Wire/iButton Part Number: DS1921G-F5,,,,,',
+    'Is Mission Active?  true,,,,,',
+    'Mission Start:  Thu Oct 23 12:03:00 IDT 2025,,,,,',
+    'Sample Rate:  Every 10 minute(s),,,,,',
+] + ['Note:  none,,,,,'] * 9 + [',,,,,']
+HEADER = 'Date/Time,Unit,Value Heat Surface Sensor,Internal temp sensor,Out Air temp,Wall Type'
 
-if base_folder.exists():
-    period1_path = base_folder / 'Period1'
-    print(f"Period1 path: {period1_path}")
-    print(f"Period1 exists: {period1_path.exists()}")
+
+def _write_logger_csv(path, n_rows=50, metadata=METADATA, trailer=()):
+    """Write a small logger CSV with n_rows 10-minute readings and optional trailing lines."""
+    times = pd.date_range('2025-10-23 12:03', periods=n_rows, freq='10min')
+    rows = [
+        f"{ts.month}/{ts.day}/{ts.year} {ts.hour}:{ts.minute:02d},C,{20 + i % 7}.5,{21 + i % 5}.0,{30 + i % 3}.5,Exposed "
+        for i, ts in enumerate(times)
+    ]
+    path.write_text('\n'.join(list(metadata) + [HEADER] + rows + list(trailer)) + '\n', encoding='utf-8')
+    return times
+
+
+def test_load_csv_file_reads_all_rows(tmp_path):
+    times = _write_logger_csv(tmp_path / 'GW_1.1_111025.csv')
+    df = load_csv_file(tmp_path / 'GW_1.1_111025.csv')
     
-    if period1_path.exists():
-        csv_files = list(period1_path.glob('*.csv'))
-        print(f"CSV files found: {len(csv_files)}")
-        print(f"Sample files: {[f.name for f in csv_files[:3]]}")
+    assert len(df) == 50
+    np.testing.assert_array_equal(df['timestamp'].to_numpy(), times.to_numpy())
+    assert df['surface_temp'].iloc[0] == 20.5
+    assert list(df['wall_type'].unique()) == ['Exposed']
 
-print("\n" + "="*80)
-print("Starting data load...")
-print("="*80 + "\n")
 
-periods = load_all_periods(base_folder)
+def test_load_csv_file_skips_trailing_junk_row(tmp_path):
+    _write_logger_csv(tmp_path / 'GW_1.1_111025.csv', trailer=['end of mission'])
+    df = load_csv_file(tmp_path / 'GW_1.1_111025.csv')
+    
+    assert df is not None
+    assert len(df) == 50
 
-if periods:
-    print("\n" + "="*80)
-    print("DATA LOAD TEST COMPLETE")
+
+def test_load_csv_file_blank_header_lines(tmp_path):
+    # Blank lines in the metadata are not counted, as with pd.read_csv(header=14)
+    metadata = METADATA[:3] + [''] + METADATA[3:7] + ['   '] + METADATA[7:]
+    _write_logger_csv(tmp_path / 'GW_1.1_111025.csv', metadata=metadata)
+    df = load_csv_file(tmp_path / 'GW_1.1_111025.csv')
+    
+    assert df is not None
+    assert len(df) == 50
+    assert {'surface_temp', 'internal_temp', 'room_temp', 'wall_type'} <= set(df.columns)
+
+
+def test_load_csv_file_without_header_line(tmp_path):
+    (tmp_path / 'GW_1.1_111025.csv').write_text('\n'.join(METADATA[:5]) + '\n', encoding='utf-8')
+    assert load_csv_file(tmp_path / 'GW_1.1_111025.csv') is None
+
+
+def test_read_with_header_skip_blank_lines_and_trailer(tmp_path):
+    metadata = [''] + METADATA
+    _write_logger_csv(tmp_path / 'GW1.1_121125.csv', metadata=metadata, trailer=['end of mission'])
+    df, header_lines, encoding = read_with_header_skip(tmp_path / 'GW1.1_121125.csv')
+    
+    assert encoding == 'utf-8'
+    assert len(df) == 50
+    assert list(df.columns) == HEADER.split(',')
+    # Metadata comes back as written, blank line included
+    assert [line.rstrip('\n') for line in header_lines] == metadata
+
+
+def test_floats_as_text_matches_pandas_to_csv():
+    df = pd.DataFrame({
+        'Date/Time': ['10/23/2025 12:03', '10/23/2025 12:13', '10/23/2025 12:23'],
+        'Temp': [21.0, 24.5, np.nan],
+        'Count': [1, 2, 3],
+    })
+    buffer = pa.BufferOutputStream()
+    pa_csv.write_csv(
+        pa.Table.from_pandas(floats_as_text(df), preserve_index=False), buffer,
+        write_options=pa_csv.WriteOptions(include_header=False, quoting_style='none')
+    )
+    
+    assert buffer.getvalue().to_pybytes().decode() == df.to_csv(index=False, header=False, lineterminator='\n')
+    assert df['Temp'].dtype == np.float64  # Input frame unchanged
+
+
+def test_parse_mdy_hm_matches_pandas():
+    strings = [
+        '10/23/2025 12:03', '1/2/2025 0:00', '12/31/2025 23:59', '2/29/2024 6:10',
+        '13/1/2025 10:00', '2/30/2025 10:00', '2/29/2025 10:00', '10/23/2025 24:00',
+        '10/23/2025 12:60', '10/23/25 12:03', 'Date/Time', '', 'nan',
+    ]
+    expected = pd.to_datetime(pd.Series(strings), format='%m/%d/%Y %H:%M', errors='coerce')
+    
+    parsed = parse_mdy_hm(strings)
+    np.testing.assert_array_equal(parsed, expected.to_numpy().astype('datetime64[us]'))
+    assert np.isnat(parsed[4:]).all()
+
+
+def _sensor_frame(n, wall_types, **columns):
+    """Per-file frame shaped like load_period_data's, with columns overridden or dropped (None)."""
+    df = pd.DataFrame({
+        'timestamp': pd.date_range('2025-10-23', periods=n, freq='10min'),
+        'surface_temp': np.arange(n, dtype='float32'),
+        'box_id': 1,
+        'sensor_id': 2,
+        'wall_id': 1,
+        'position': 'out',
+        'wall_type': pd.Categorical(wall_types),
+    })
+    for col, value in columns.items():
+        if value is None:
+            df = df.drop(columns=col)
+        else:
+            df[col] = value
+    return df
+
+
+def _check_stack(frames):
+    stacked = stack_frames(frames)
+    expected = pd.concat(frames, ignore_index=True)
+    
+    pd.testing.assert_frame_equal(stacked.drop(columns='wall_type'), expected.drop(columns='wall_type'))
+    assert isinstance(stacked['wall_type'].dtype, pd.CategoricalDtype)
+    assert stacked['wall_type'].astype(object).equals(expected['wall_type'].astype(object))
+
+
+def test_stack_frames_matches_concat():
+    _check_stack([
+        _sensor_frame(3, ['Exposed'] * 3),
+        _sensor_frame(2, ['Yarka', 'Exposed'], sensor_id=5, surface_temp=np.array([1.5, np.nan], dtype='float32')),
+    ])
+
+
+def test_stack_frames_unknown_sensor_wall():
+    # get_sensor_wall gives (None, None) for an unknown sensor id
+    _check_stack([
+        _sensor_frame(3, ['Exposed'] * 3),
+        _sensor_frame(2, ['Exposed'] * 2, sensor_id=17, wall_id=pd.Series([None, None], dtype=object), position=pd.Series([None, None], dtype=object)),
+    ])
+
+
+def test_stack_frames_missing_columns_upcast():
+    _check_stack([
+        _sensor_frame(3, ['Exposed'] * 3),
+        _sensor_frame(2, ['Exposed'] * 2, sensor_id=None, surface_temp=None),
+        _sensor_frame(1, ['Yarka'], position=None),
+    ])
+
+
+def main():
+    print("Testing data loading...")
     print("="*80)
-    print(f"Periods loaded: {list(periods.keys())}")
-    for name, df in periods.items():
-        print(f"\n{name}:")
-        print(f"  Shape: {df.shape}")
-        print(f"  Columns: {list(df.columns)}")
-        print(f"  Sensors: {sorted(df['sensor_id'].unique())}")
-        print(f"  First timestamp: {df['timestamp'].min()}")
-        print(f"  Last timestamp: {df['timestamp'].max()}")
-else:
-    print("\n❌ No data loaded!")
-
-print("\nCheck the log file for detailed loading information.")
+    
+    base_folder = Path(__file__).parent / 'data_cleaned'
+    print(f"Base folder: {base_folder}")
+    print(f"Exists: {base_folder.exists()}")
+    
+    if base_folder.exists():
+        period1_path = base_folder / 'Period1'
+        print(f"Period1 path: {period1_path}")
+        print(f"Period1 exists: {period1_path.exists()}")
+    
+        if period1_path.exists():
+            csv_files = list(period1_path.glob('*.csv'))
+            print(f"CSV files found: {len(csv_files)}")
+            print(f"Sample files: {[f.name for f in csv_files[:3]]}")
+    
+    print("\n" + "="*80)
+    print("Starting data load...")
+    print("="*80 + "\n")
+    
+    periods = load_all_periods(base_folder)
+    
+    if periods:
+        print("\n" + "="*80)
+        print("DATA LOAD TEST COMPLETE")
+        print("="*80)
+        print(f"Periods loaded: {list(periods.keys())}")
+        for name, df in periods.items():
+            print(f"\n{name}:")
+            print(f"  Shape: {df.shape}")
+            print(f"  Columns: {list(df.columns)}")
+            print(f"  Sensors: {sorted(df['sensor_id'].unique())}")
+            print(f"  First timestamp: {df['timestamp'].min()}")
+            print(f"  Last timestamp: {df['timestamp'].max()}")
+    else:
+        print("\n❌ No data loaded!")
+    
+    print("\nCheck the log file for detailed loading information.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,49 +1,206 @@
 """
 Quick test to verify transform pipeline works with loaded data.
+Run directly for the full pipeline check; the test_* functions run under pytest.
 """
 from pathlib import Path
 from src.load import load_all_periods
-from src.transform import transform_all_data
+from src.transform import transform_all_data, apply_smoothing, detect_wall_type_changes
+from src.plots import downsample_lttb
+import numpy as np
+import pandas as pd
 import sys
 
-# Fix unicode output for Windows
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
-
-print("="*80)
-print("TESTING TRANSFORM PIPELINE")
-print("="*80)
-
-# Load data
-base_folder = Path(__file__).parent / 'data_cleaned'
-periods = load_all_periods(base_folder)
-
-if not periods:
-    print("ERROR: No data loaded")
-    exit(1)
-
-print(f"\nLoaded {len(periods)} period(s)")
-
-# Transform
-print("\n" + "="*80)
-print("RUNNING TRANSFORM...")
-print("="*80)
-
-try:
-    transformed = transform_all_data(periods)
-    
-    if transformed:
-        print("\nTRANSFORM SUCCESS!")
-        print("\nTransformed data levels:")
-        for level, df in transformed.items():
-            if df is not None:
-                print(f"  {level:10s}: {df.shape[0]:6,} rows x {df.shape[1]:2} columns")
-                print(f"             Columns: {list(df.columns[:8])}...")
-    else:
-        print("\nTransform returned None")
+
+def _detect_wall_type_changes_loop(df):
+    """Original row-by-row detect_wall_type_changes, kept as the reference."""
+    if df is None or 'wall_type' not in df.columns:
+        return []
+    
+    df = df.sort_values('timestamp')
+    changes = df[df['wall_type'].ne(df['wall_type'].shift())].copy()
+    
+    if len(changes) == 0:
+        return []
+    
+    consolidated = []
+    current_type = None
+    current_timestamps = []
+    
+    for _, row in changes.iterrows():
+        wall_type = row['wall_type']
+        timestamp = row['timestamp']
+        
+        if wall_type == current_type:
+            current_timestamps.append(timestamp)
+        else:
+            if current_type is not None and current_timestamps:
+                mean_timestamp = pd.Timestamp(
+                    int(np.mean([ts.value for ts in current_timestamps])),
+                    unit='ns'
+                )
+                consolidated.append((mean_timestamp, current_type))
+            
+            current_type = wall_type
+            current_timestamps = [timestamp]
+    
+    if current_type is not None and current_timestamps:
+        mean_timestamp = pd.Timestamp(
+            int(np.mean([ts.value for ts in current_timestamps])),
+            unit='ns'
+        )
+        consolidated.append((mean_timestamp, current_type))
+    
+    return consolidated
+
+
+def _wall_frame(n=300, seed=0):
+    """Interleaved box/wall series on a 10-minute grid, shuffled, with a few NaNs."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range('2025-10-23', periods=n, freq='10min')
+    df = pd.DataFrame([
+        {'box_id': box, 'wall_id': wall, 'timestamp': ts}
+        for box in (1, 2) for wall in (1, 2) for ts in times
+    ])
+    df['out_surface'] = rng.normal(20, 2, len(df))
+    df['in_surface'] = rng.normal(22, 1, len(df))
+    df.loc[rng.choice(len(df), 20, replace=False), 'out_surface'] = np.nan
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def _expected_rolling(df, columns, window):
+    """Per-series time-based pandas rolling mean, keyed by (box_id, wall_id, timestamp)."""
+    expected = (
+        df.sort_values('timestamp')
+        .set_index('timestamp')
+        .groupby(['box_id', 'wall_id'])[columns]
+        .rolling(window).mean()
+        .reset_index()
+    )
+    return expected.sort_values(['box_id', 'wall_id', 'timestamp']).reset_index(drop=True)
+
+
+def _check_smoothing(df, window):
+    columns = ['out_surface', 'in_surface']
+    smoothed = apply_smoothing(df, columns, window)
+    
+    # Full resolution: every input row comes back
+    assert len(smoothed) == len(df)
+    
+    smoothed = smoothed.sort_values(['box_id', 'wall_id', 'timestamp']).reset_index(drop=True)
+    expected = _expected_rolling(df, columns, window)
+    for col in columns:
+        np.testing.assert_allclose(smoothed[f'{col}_smooth'], expected[col], equal_nan=True)
+        np.testing.assert_array_equal(smoothed[col], df.sort_values(['box_id', 'wall_id', 'timestamp'])[col])
+
+
+def test_apply_smoothing_matches_pandas_rolling():
+    _check_smoothing(_wall_frame(), '1h')
+    _check_smoothing(_wall_frame(seed=1), '3h')
+
+
+def test_apply_smoothing_irregular_spacing_matches_pandas_rolling():
+    df = _wall_frame(seed=2)
+    # Dropped rows leave gaps, so the row-count fast path does not apply
+    _check_smoothing(df.drop(df.sample(frac=0.1, random_state=2).index), '1h')
+
+
+def test_apply_smoothing_without_window_is_unchanged():
+    df = _wall_frame()
+    assert apply_smoothing(df, ['out_surface'], None) is df
+
+
+def test_detect_wall_type_changes_matches_loop():
+    times = pd.date_range('2025-12-03 11:00', periods=40, freq='10min')
+    sequence = ['Control'] * 10 + ['Green'] * 5 + ['Control'] * 3 + ['Insulated'] * 12 + ['Green'] * 10
+    df = pd.DataFrame({'timestamp': times, 'wall_type': sequence})
+    df = df.sample(frac=1, random_state=0)
+    
+    assert detect_wall_type_changes(df) == _detect_wall_type_changes_loop(df)
+    assert [wall_type for _, wall_type in detect_wall_type_changes(df)] == ['Control', 'Green', 'Control', 'Insulated', 'Green']
+
+
+def test_detect_wall_type_changes_repeated_timestamps_and_gaps_match_loop():
+    # Several walls share each timestamp and some wall types are missing
+    df = _wall_frame(n=60, seed=3)
+    rng = np.random.default_rng(3)
+    df['wall_type'] = rng.choice(['Control', 'Green', None], len(df), p=[0.6, 0.3, 0.1])
+    df = df.sort_values('timestamp', kind='stable')
+    
+    assert detect_wall_type_changes(df) == _detect_wall_type_changes_loop(df)
+
+
+def test_detect_wall_type_changes_without_column():
+    assert detect_wall_type_changes(None) == []
+    assert detect_wall_type_changes(pd.DataFrame({'timestamp': []})) == []
+
+
+def test_downsample_lttb_keeps_endpoints_and_respects_n_out():
+    rng = np.random.default_rng(0)
+    x = pd.date_range('2025-10-23', periods=5000, freq='10min').to_numpy()
+    y = np.cumsum(rng.normal(size=5000))
+    y[100:150] = np.nan
+    
+    for n_out in (3, 10, 500):
+        x_out, y_out = downsample_lttb(x, y, n_out=n_out)
+        assert len(x_out) == len(y_out) == n_out
+        assert x_out[0] == x[0] and x_out[-1] == x[-1]
+        assert y_out[0] == y[0] and y_out[-1] == y[-1]
+        # Selected points are original points in time order
+        assert np.all(np.diff(x_out.astype(np.int64)) > 0)
+        assert np.isin(x_out, x).all()
+
+
+def test_downsample_lttb_short_series_unchanged():
+    x = np.arange(50)
+    y = np.sin(x / 5.0)
+    x_out, y_out = downsample_lttb(x, y, n_out=100)
+    np.testing.assert_array_equal(x_out, x)
+    np.testing.assert_array_equal(y_out, y)
+
+
+def main():
+    # Fix unicode output for Windows
+    if sys.platform == 'win32':
+        sys.stdout.reconfigure(encoding='utf-8')
+    
+    print("="*80)
+    print("TESTING TRANSFORM PIPELINE")
+    print("="*80)
+    
+    # Load data
+    base_folder = Path(__file__).parent / 'data_cleaned'
+    periods = load_all_periods(base_folder)
+    
+    if not periods:
+        print("ERROR: No data loaded")
+        exit(1)
+    
+    print(f"\nLoaded {len(periods)} period(s)")
+    
+    # Transform
+    print("\n" + "="*80)
+    print("RUNNING TRANSFORM...")
+    print("="*80)
+    
+    try:
+        transformed = transform_all_data(periods)
         
-except Exception as e:
-    print(f"\nTRANSFORM FAILED!")
-    print(f"Error: {e}")
-    import traceback
-    traceback.print_exc()
+        if transformed:
+            print("\nTRANSFORM SUCCESS!")
+            print("\nTransformed data levels:")
+            for level, df in transformed.items():
+                if df is not None:
+                    print(f"  {level:10s}: {df.shape[0]:6,} rows x {df.shape[1]:2} columns")
+                    print(f"             Columns: {list(df.columns[:8])}...")
+        else:
+            print("\nTransform returned None")
+    
+    except Exception as e:
+        print(f"\nTRANSFORM FAILED!")
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == '__main__':
+    main()